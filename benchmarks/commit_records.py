@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from records import Commit, parse_datetime  # noqa: E402
+
+NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+
+
+def github_page(repo: int, commits: int) -> str:
+    page: list[dict[str, Any]] = []
+    for index in range(commits):
+        sha = f"{repo:08x}{index:032x}"
+        date = (NOW - timedelta(minutes=index)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        person = {"name": "Alice", "email": "alice@example.com", "date": date}
+        user = {
+            "login": "alice",
+            "id": 1,
+            "type": "User",
+            "avatar_url": "https://avatars.githubusercontent.com/u/1?v=4",
+            "html_url": "https://github.com/alice",
+            "url": "https://api.github.com/users/alice",
+        }
+        page.append(
+            {
+                "sha": sha,
+                "node_id": f"C_{sha}",
+                "url": f"https://api.github.com/repos/org/repo-{repo}/commits/{sha}",
+                "html_url": f"https://github.com/org/repo-{repo}/commit/{sha}",
+                "comments_url": f"https://api.github.com/repos/org/repo-{repo}/commits/{sha}/comments",
+                "author": user,
+                "committer": user,
+                "parents": [{"sha": sha, "url": f"https://api.github.com/repos/org/repo-{repo}/commits/{sha}"}],
+                "commit": {
+                    "message": f"Change {index} in repo {repo}\n\nLonger description of the change.",
+                    "author": person,
+                    "committer": person,
+                    "tree": {"sha": sha, "url": f"https://api.github.com/repos/org/repo-{repo}/git/trees/{sha}"},
+                    "comment_count": 0,
+                    "verification": {"verified": False, "reason": "unsigned", "signature": None, "payload": None},
+                },
+            }
+        )
+    return json.dumps(page)
+
+
+def raw_dicts(pages: list[str]) -> list[list[Any]]:
+    kept: list[list[Any]] = []
+    for page in pages:
+        commits = json.loads(page)
+        newest = max(parse_datetime(commit["commit"]["committer"]["date"]) for commit in commits)
+        cutoff = newest - timedelta(days=3)
+        kept.append([commit for commit in commits if parse_datetime(commit["commit"]["committer"]["date"]) >= cutoff])
+    return kept
+
+
+def records(pages: list[str]) -> list[list[Any]]:
+    kept: list[list[Any]] = []
+    for page in pages:
+        commits = [Commit.from_github(item) for item in json.loads(page)]
+        newest = max(commit.committed_at for commit in commits)
+        cutoff = newest - timedelta(days=3)
+        kept.append([commit for commit in commits if commit.committed_at >= cutoff])
+    return kept
+
+
+def measure(name: str, run: Callable[[list[str]], list[list[Any]]], pages: list[str]) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    kept = run(pages)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} {retained:>14,} bytes retained {peak:>14,} bytes peak {elapsed:>8.2f}s")
+    del kept
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare memory and time for raw commit dicts and records")
+    parser.add_argument("--repos", type=int, default=1000)
+    parser.add_argument("--commits", type=int, default=30)
+    arguments = parser.parse_args()
+
+    pages = [github_page(repo, arguments.commits) for repo in range(arguments.repos)]
+    print(f"Commit ingestion for {arguments.repos} repos x {arguments.commits} commits")
+    measure("raw dicts", raw_dicts, pages)
+    measure("records", records, pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import zlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Literal
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+import httpx
+
+LatencyDistribution = Literal["fixed", "uniform", "exponential", "lognormal"]
+
+
+@dataclass(frozen=True, slots=True)
+class FakeGitHubOptions:
+    stars: int
+    active_ratio: float = 0.3
+    commits_per_repo: int = 10
+    bot_ratio: float = 0.1
+    unchanged_ratio: float = 0.5
+    latency_ms: float = 0
+    latency_distribution: LatencyDistribution = "fixed"
+    rate_limit_every: int = 0
+    retry_after: float = 0
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class _FakeRepo:
+    full_name: str
+    pushed_at: datetime
+    commits: list[dict[str, Any]] = field(default_factory=list)
+
+
+class FakeGitHub:
+    def __init__(self, options: FakeGitHubOptions, *, now: datetime) -> None:
+        self.options = options
+        self.now = now
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+        self.bytes_sent = 0
+        self._random = random.Random(options.seed)
+        self._latency_random = random.Random(options.seed + 1)
+        self._starred_version = 0
+        self._repos: list[_FakeRepo] = []
+        self._repos_by_name: dict[str, _FakeRepo] = {}
+        active_repos = round(options.stars * options.active_ratio)
+        for index in range(options.stars):
+            name = f"org-{index % 97}/repo-{index}"
+            if index < active_repos:
+                repo = _FakeRepo(name, now - timedelta(hours=self._random.uniform(0, 20)))
+                self._add_commits(repo, since=repo.pushed_at - timedelta(hours=24), until=repo.pushed_at)
+            else:
+                repo = _FakeRepo(name, now - timedelta(days=self._random.uniform(5, 400)))
+            self._repos.append(repo)
+            self._repos_by_name[name] = repo
+        self._repos.sort(key=lambda repo: repo.pushed_at, reverse=True)
+
+    def reset_counters(self) -> None:
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+        self.bytes_sent = 0
+
+    def advance(self, delta: timedelta) -> None:
+        previous = self.now
+        self.now += delta
+        for repo in self._repos:
+            if not repo.commits or self._random.random() < self.options.unchanged_ratio:
+                continue
+            self._add_commits(repo, since=previous, until=self.now)
+        self._repos.sort(key=lambda repo: repo.pushed_at, reverse=True)
+        self._starred_version += 1
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if delay := self._latency():
+            await asyncio.sleep(delay)
+        if self.options.rate_limit_every and self.requests % self.options.rate_limit_every == 0:
+            self.rate_limited += 1
+            return httpx.Response(
+                429,
+                headers={"Retry-After": str(self.options.retry_after), "X-RateLimit-Remaining": "0"},
+                json={"message": "You have exceeded a secondary rate limit"},
+            )
+
+        path = request.url.path
+        if path == "/user/starred":
+            response = self._starred(request)
+        elif path.startswith("/repos/") and path.endswith("/commits"):
+            response = self._commits(request, path.removeprefix("/repos/").removesuffix("/commits"))
+        else:
+            response = httpx.Response(404, json={"message": "Not Found"})
+        if response.status_code == 304:
+            self.not_modified += 1
+        self.bytes_sent += len(response.content)
+        response.headers.update({"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4999"})
+        return response
+
+    def _starred(self, request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params.get("page", 1))
+        per_page = int(request.url.params.get("per_page", 30))
+        etag = f'"{hashlib.sha1(f"{self._starred_version}:{page}:{per_page}".encode()).hexdigest()}"'
+        headers = {"ETag": etag, **_links(request, page=page, pages=-(-len(self._repos) // per_page))}
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers=headers)
+        repos = self._repos[(page - 1) * per_page : page * per_page]
+        return httpx.Response(200, headers=headers, json=[_repo_json(repo) for repo in repos])
+
+    def _commits(self, request: httpx.Request, repo_name: str) -> httpx.Response:
+        repo = self._repos_by_name.get(repo_name)
+        if repo is None:
+            return httpx.Response(404, json={"message": "Not Found"})
+        newest = repo.commits[0]["commit"]["committer"]["date"] if repo.commits else None
+        headers = {"Last-Modified": format_datetime(_parse(newest), usegmt=True)} if newest else {}
+        if (modified_since := request.headers.get("If-Modified-Since")) and (
+            newest is None or _parse(newest) <= parsedate_to_datetime(modified_since)
+        ):
+            return httpx.Response(304, headers=headers)
+
+        commits = repo.commits
+        if since := request.url.params.get("since"):
+            cutoff = _parse(since)
+            commits = [commit for commit in commits if _parse(commit["commit"]["committer"]["date"]) >= cutoff]
+        page = int(request.url.params.get("page", 1))
+        per_page = int(request.url.params.get("per_page", 30))
+        headers.update(_links(request, page=page, pages=-(-len(commits) // per_page)))
+        return httpx.Response(200, headers=headers, json=commits[(page - 1) * per_page : page * per_page])
+
+    def _add_commits(self, repo: _FakeRepo, *, since: datetime, until: datetime) -> None:
+        count = self._random.randint(1, max(2 * self.options.commits_per_repo - 1, 1))
+        dates = sorted((self._random.uniform(0, 1) for _ in range(count)), reverse=True)
+        new_commits = []
+        for offset in dates:
+            committed_at = since + (until - since) * offset
+            sha = hashlib.sha1(f"{repo.full_name}:{committed_at.isoformat()}:{len(repo.commits)}".encode()).hexdigest()
+            bot = self._random.random() < self.options.bot_ratio
+            new_commits.append(_commit_json(repo.full_name, sha, committed_at, bot=bot))
+        repo.commits[:0] = new_commits
+        repo.pushed_at = max(repo.pushed_at, _parse(new_commits[0]["commit"]["committer"]["date"]))
+
+    def _latency(self) -> float:
+        mean = self.options.latency_ms / 1000
+        if mean <= 0:
+            return 0
+        match self.options.latency_distribution:
+            case "fixed":
+                return mean
+            case "uniform":
+                return self._latency_random.uniform(0, 2 * mean)
+            case "exponential":
+                return self._latency_random.expovariate(1 / mean)
+            case "lognormal":
+                return self._latency_random.lognormvariate(0, 0.75) * mean / 1.3246
+
+
+@asynccontextmanager
+async def serve_h2c(github: FakeGitHub, *, host: str = "127.0.0.1") -> AsyncIterator[str]:
+    connections: set[asyncio.Task[None]] = set()
+
+    async def accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        connections.add(task)
+        try:
+            await _H2Connection(github, reader, writer).serve()
+        finally:
+            connections.discard(task)
+            writer.close()
+
+    server = await asyncio.start_server(accept, host, 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.close()
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+        await server.wait_closed()
+
+
+class _H2Connection:
+    def __init__(self, github: FakeGitHub, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._github = github
+        self._reader = reader
+        self._writer = writer
+        self._connection = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self._requests: dict[int, tuple[list[tuple[str, str]], bytearray]] = {}
+        self._window_opened: dict[int, asyncio.Event] = {}
+        self._responses: set[asyncio.Task[None]] = set()
+
+    async def serve(self) -> None:
+        self._connection.initiate_connection()
+        self._flush()
+        try:
+            while data := await self._reader.read(65536):
+                for event in self._connection.receive_data(data):
+                    self._receive(event)
+                self._flush()
+        finally:
+            for task in self._responses:
+                task.cancel()
+            await asyncio.gather(*self._responses, return_exceptions=True)
+
+    def _receive(self, event: h2.events.Event) -> None:
+        if isinstance(event, h2.events.RequestReceived):
+            self._requests[event.stream_id] = (list(event.headers), bytearray())
+        elif isinstance(event, h2.events.DataReceived):
+            self._requests[event.stream_id][1].extend(event.data)
+            self._connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            headers, body = self._requests.pop(event.stream_id)
+            task = asyncio.create_task(self._respond(event.stream_id, headers, bytes(body)))
+            self._responses.add(task)
+            task.add_done_callback(self._responses.discard)
+        elif isinstance(event, h2.events.WindowUpdated | h2.events.StreamReset):
+            waiters = (
+                self._window_opened.values() if event.stream_id == 0 else [self._window_opened.get(event.stream_id)]
+            )
+            for waiter in waiters:
+                if waiter is not None:
+                    waiter.set()
+
+    async def _respond(self, stream_id: int, headers: list[tuple[str, str]], body: bytes) -> None:
+        pseudo = {name: value for name, value in headers if name.startswith(":")}
+        request = httpx.Request(
+            pseudo[":method"],
+            f"http://{pseudo[':authority']}{pseudo[':path']}",
+            headers=[(name, value) for name, value in headers if not name.startswith(":")],
+            content=body,
+        )
+        response = await self._github.handle(request)
+        content = response.content
+        response_headers = [(":status", str(response.status_code))]
+        response_headers.extend(
+            (name.lower(), value) for name, value in response.headers.items() if name.lower() != "content-length"
+        )
+        response_headers.append(("content-length", str(len(content))))
+        with suppress(h2.exceptions.StreamClosedError):
+            self._connection.send_headers(stream_id, response_headers, end_stream=not content)
+            self._flush()
+            while content:
+                window = min(
+                    self._connection.local_flow_control_window(stream_id), self._connection.max_outbound_frame_size
+                )
+                if window <= 0:
+                    waiter = self._window_opened[stream_id] = asyncio.Event()
+                    await waiter.wait()
+                    continue
+                self._connection.send_data(stream_id, content[:window], end_stream=len(content) <= window)
+                content = content[window:]
+                self._flush()
+        self._window_opened.pop(stream_id, None)
+
+    def _flush(self) -> None:
+        if data := self._connection.data_to_send():
+            self._writer.write(data)
+
+
+def _links(request: httpx.Request, *, page: int, pages: int) -> dict[str, str]:
+    links = []
+    if page < pages:
+        links.append(f'<{request.url.copy_set_param("page", page + 1)}>; rel="next"')
+        links.append(f'<{request.url.copy_set_param("page", pages)}>; rel="last"')
+    return {"Link": ", ".join(links)} if links else {}
+
+
+def _repo_json(repo: _FakeRepo) -> dict[str, Any]:
+    owner, name = repo.full_name.split("/")
+    return {
+        "id": zlib.crc32(repo.full_name.encode()),
+        "name": name,
+        "full_name": repo.full_name,
+        "owner": {"login": owner, "type": "Organization"},
+        "html_url": f"https://github.com/{repo.full_name}",
+        "description": f"Synthetic repository {repo.full_name}",
+        "fork": False,
+        "topics": ["synthetic", f"topic-{zlib.crc32(owner.encode()) % 13}"],
+        "pushed_at": _format(repo.pushed_at),
+        "default_branch": "main",
+        "stargazers_count": 42,
+    }
+
+
+def _commit_json(repo_name: str, sha: str, committed_at: datetime, *, bot: bool) -> dict[str, Any]:
+    login = "dependabot[bot]" if bot else "alice"
+    person = {"name": login, "email": f"{login}@example.com", "date": _format(committed_at)}
+    user = {"login": login, "id": 1, "type": "Bot" if bot else "User"}
+    return {
+        "sha": sha,
+        "url": f"https://api.github.com/repos/{repo_name}/commits/{sha}",
+        "html_url": f"https://github.com/{repo_name}/commit/{sha}",
+        "author": user,
+        "committer": user,
+        "parents": [],
+        "commit": {
+            "message": "Bump dependency" if bot else f"Change {sha[:7]} in {repo_name}\n\nLonger description.",
+            "author": person,
+            "committer": person,
+        },
+    }
+
+
+def _format(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value)
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from commit_feed import CommitFeed  # noqa: E402
+from config import Config  # noqa: E402
+from fake_github import FakeGitHub, FakeGitHubOptions, serve_h2c  # noqa: E402
+from github_client import ETagCache, GitHubClient  # noqa: E402
+from log import logger  # noqa: E402
+from pipeline import run_daily  # noqa: E402
+from summarizer import DisabledSummarizer  # noqa: E402
+
+NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+Transport = Literal["mock", "h2c"]
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    name: str
+    github: FakeGitHubOptions
+    runs: int = 2
+    fetch_concurrency: int = 8
+    fetch_limit: int = 0
+    rate_limit_wait: float = 60
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("small", FakeGitHubOptions(stars=200, commits_per_repo=5)),
+        Scenario("large", FakeGitHubOptions(stars=5000, active_ratio=0.2, commits_per_repo=20, bot_ratio=0.2)),
+        Scenario("busy", FakeGitHubOptions(stars=500, active_ratio=0.8, commits_per_repo=250), fetch_limit=30),
+        Scenario(
+            "slow",
+            FakeGitHubOptions(stars=1000, latency_ms=60, latency_distribution="lognormal"),
+            fetch_concurrency=16,
+        ),
+        Scenario("throttled", FakeGitHubOptions(stars=1000, rate_limit_every=25)),
+    )
+}
+
+
+async def run_scenario(scenario: Scenario, *, transport: Transport) -> list[dict[str, Any]]:
+    github = FakeGitHub(scenario.github, now=NOW)
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        workspace = Path(directory)
+        config = Config(
+            github_token="token",
+            report_date=NOW.date(),
+            repo_limit=scenario.github.stars,
+            empty_streak_limit=10,
+            summarizer_model=None,
+            is_ci=False,
+            github_output=None,
+            fetch_concurrency=scenario.fetch_concurrency,
+            rate_limit_wait=scenario.rate_limit_wait,
+            commit_fetch_limit=scenario.fetch_limit,
+        )
+        for run in range(1, scenario.runs + 1):
+            config = replace(config, report_date=github.now.date())
+            github.reset_counters()
+            started = time.perf_counter()
+            async with github_client(
+                github,
+                transport=transport,
+                etag_file=workspace / "etags.json",
+                rate_limit_wait=scenario.rate_limit_wait,
+            ) as client:
+                artifacts = await run_daily(
+                    config,
+                    transport=client,
+                    commit_feed=CommitFeed(
+                        client,
+                        watermark_file=workspace / "watermarks.json",
+                        now=lambda: github.now,
+                        fetch_limit=scenario.fetch_limit,
+                    ),
+                    summarizer=DisabledSummarizer(),
+                    report_dir=workspace / "reports",
+                    published_at=github.now,
+                )
+            elapsed = time.perf_counter() - started
+            report = artifacts.load_report()
+            results.append(
+                {
+                    "scenario": scenario.name,
+                    "transport": transport,
+                    "run": run,
+                    "seconds": elapsed,
+                    "requests": github.requests,
+                    "not_modified": github.not_modified,
+                    "rate_limited": github.rate_limited,
+                    "bytes": github.bytes_sent,
+                    "repos": report["total_repos_count"],
+                    "commits": report["total_commits_count"],
+                    "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+                }
+            )
+            github.advance(timedelta(days=1))
+    return results
+
+
+@asynccontextmanager
+async def github_client(
+    github: FakeGitHub, *, transport: Transport, etag_file: Path, rate_limit_wait: float
+) -> AsyncIterator[GitHubClient]:
+    async with AsyncExitStack() as stack:
+        http_transport: httpx.AsyncBaseTransport
+        if transport == "h2c":
+            base_url = await stack.enter_async_context(serve_h2c(github))
+            http_transport = httpx.AsyncHTTPTransport(http1=False, http2=True)
+        else:
+            base_url = "https://api.github.com"
+            http_transport = httpx.MockTransport(github.handle)
+        yield await stack.enter_async_context(
+            GitHubClient(
+                "token",
+                base_url=base_url,
+                transport=http_transport,
+                etag_cache=ETagCache(etag_file),
+                rate_limit_wait=rate_limit_wait,
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run daily reports against a synthetic GitHub and report their cost")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    parser.add_argument("--transport", choices=["mock", "h2c"], action="append")
+    parser.add_argument("--runs", type=int)
+    parser.add_argument("--stars", type=int)
+    parser.add_argument("--commits", type=int)
+    parser.add_argument("--bot-ratio", type=float)
+    parser.add_argument("--unchanged-ratio", type=float)
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--rate-limit-every", type=int)
+    parser.add_argument("--fetch-concurrency", type=int)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.child:
+        logger.setLevel(logging.ERROR)
+        child = json.loads(arguments.child)
+        scenario = Scenario(**{**child["scenario"], "github": FakeGitHubOptions(**child["scenario"]["github"])})
+        for result in asyncio.run(run_scenario(scenario, transport=child["transport"])):
+            print(json.dumps(result))
+        return
+
+    failures = 0
+    print(
+        f"{'scenario':<10} {'transport':<9} {'run':>3} {'wall':>8} {'requests':>9} {'304s':>6} {'429s':>5} "
+        f"{'bytes':>14} {'repos':>6} {'commits':>8} {'peak RSS':>14}"
+    )
+    for name in arguments.scenario or list(SCENARIOS):
+        scenario = _with_overrides(SCENARIOS[name], arguments)
+        for transport in arguments.transport or ["mock", "h2c"]:
+            child = json.dumps({"scenario": asdict(scenario), "transport": transport})
+            process = subprocess.run(
+                [sys.executable, __file__, "--child", child], capture_output=True, text=True, check=False
+            )
+            if process.returncode != 0:
+                lines = [line.strip(" |") for line in process.stderr.splitlines()]
+                error = next((line for line in reversed(lines) if "Error" in line), "no error output")
+                print(f"{scenario.name:<10} {transport:<9} failed: {error}")
+                failures += 1
+                continue
+            for line in process.stdout.splitlines():
+                result = json.loads(line)
+                print(
+                    f"{result['scenario']:<10} {result['transport']:<9} {result['run']:>3} "
+                    f"{result['seconds']:>7.2f}s {result['requests']:>9,} {result['not_modified']:>6,} "
+                    f"{result['rate_limited']:>5,} {result['bytes']:>14,} {result['repos']:>6,} "
+                    f"{result['commits']:>8,} {result['peak_rss']:>14,}"
+                )
+    if failures:
+        sys.exit(f"{failures} scenario runs failed")
+
+
+def _with_overrides(scenario: Scenario, arguments: argparse.Namespace) -> Scenario:
+    github_overrides = {
+        field: value
+        for field, value in {
+            "stars": arguments.stars,
+            "commits_per_repo": arguments.commits,
+            "bot_ratio": arguments.bot_ratio,
+            "unchanged_ratio": arguments.unchanged_ratio,
+            "latency_ms": arguments.latency_ms,
+            "latency_distribution": arguments.latency_distribution,
+            "rate_limit_every": arguments.rate_limit_every,
+        }.items()
+        if value is not None
+    }
+    scenario_overrides = {
+        field: value
+        for field, value in {"runs": arguments.runs, "fetch_concurrency": arguments.fetch_concurrency}.items()
+        if value is not None
+    }
+    return replace(scenario, github=replace(scenario.github, **github_overrides), **scenario_overrides)
+
+
+if __name__ == "__main__":
+    main()
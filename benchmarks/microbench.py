@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from records import Commit, Repo, as_utc, parse_datetime  # noqa: E402
+from report import (  # noqa: E402
+    ReportRow,
+    TopicGroups,
+    assemble_report,
+    markdown_fields,
+    render_json_feed,
+    render_markdown,
+)
+from selection import advance_empty_streak, select_repos  # noqa: E402
+from summarizer import _meaningful_messages  # noqa: E402
+
+NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+Case = Callable[[], object]
+
+
+def synthetic_rows(size: int, *, seed: int) -> list[ReportRow]:
+    rng = random.Random(seed)
+    topics = [f"topic-{index}" for index in range(max(size // 10, 20))]
+    weights = [1 / (rank + 1) for rank in range(len(topics))]
+    rows: list[ReportRow] = []
+    for index in range(size):
+        name = f"org/repo-{index:06d}"
+        commits = [
+            Commit(
+                sha=f"{index:08x}{position:032x}",
+                message=("Merge pull request #1" if position % 7 == 0 else f"Change {position}") + "\n\nDetails",
+                authored_date=(NOW - timedelta(minutes=position)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                committed_at=NOW - timedelta(minutes=position),
+                author_login="alice",
+            )
+            for position in range(rng.randint(0, 8))
+        ]
+        rows.append(
+            ReportRow(
+                repo=Repo(
+                    full_name=name,
+                    html_url=f"https://github.com/{name}",
+                    description=f"Description {index}",
+                    topics=tuple(sorted(set(rng.choices(topics, weights=weights, k=rng.randint(0, 5))))),
+                    pushed_at=NOW - timedelta(hours=rng.uniform(0, 24 * 10)),
+                ),
+                commits=commits,
+                summary=f"Summary {index}" if index % 3 else None,
+                commit_count=len(commits),
+            )
+        )
+    return rows
+
+
+def cases(size: int, *, seed: int) -> dict[str, Case]:
+    rows = synthetic_rows(size, seed=seed)
+    repos = [row.repo for row in rows]
+    report = assemble_report(rows)
+    active_fields = [markdown_fields(repo) for repo in report["repos"] if repo["commit_count"] > 0]
+    half = len(active_fields) // 2
+    cached_groups = TopicGroups()
+    cached_groups.add(active_fields[:half])
+    cached_state = cached_groups.to_json()
+    cutoff = NOW - timedelta(days=3)
+    excluded_names = {repo.full_name for repo in repos[::5]}
+    timestamps = [row.repo.pushed_at.strftime("%Y-%m-%dT%H:%M:%SZ") for row in rows if row.repo.pushed_at]
+
+    def empty_streaks() -> int:
+        count = 0
+        for row in rows:
+            count = advance_empty_streak(current=count, has_commits=bool(row.commits), limit=0).count
+        return count
+
+    def splice_groups() -> None:
+        topic_groups = TopicGroups.from_json(cached_state)
+        topic_groups.add(active_fields[half:])
+
+    return {
+        "select_repos": lambda: select_repos(
+            repos,
+            excluded_names=excluded_names,
+            limit=size,
+            is_active=lambda repo: repo.pushed_at is not None and repo.pushed_at > cutoff,
+        ),
+        "advance_empty_streak": empty_streaks,
+        "assemble_report": lambda: assemble_report(rows),
+        "render_markdown": lambda: render_markdown(report),
+        "render_json_feed": lambda: render_json_feed(report, published_at=NOW),
+        "topic_groups_splice": splice_groups,
+        "meaningful_messages": lambda: [_meaningful_messages(row.commits) for row in rows],
+        "parse_datetime": lambda: [parse_datetime(value) for value in timestamps],
+        "as_utc": lambda: [as_utc(row.repo.pushed_at) for row in rows if row.repo.pushed_at],
+    }
+
+
+def measure(case: Case, *, repeat: int) -> float:
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(sizes: list[int], *, repeat: int, seed: int, only: list[str] | None) -> dict[str, float]:
+    results: dict[str, float] = {}
+    for size in sizes:
+        for name, case in cases(size, seed=seed).items():
+            if only and name not in only:
+                continue
+            key = f"{name}[{size}]"
+            results[key] = measure(case, repeat=repeat)
+            print(f"{key:<32} {results[key] * 1000:>12.3f} ms", flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time pure functions on synthetic inputs and compare with baselines")
+    parser.add_argument("command", choices=["run", "save", "compare"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--only", nargs="+")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    arguments = parser.parse_args()
+
+    results = run(arguments.sizes, repeat=arguments.repeat, seed=arguments.seed, only=arguments.only)
+    machine = {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+    if arguments.command == "save":
+        baseline: dict[str, Any] = {"version": 1, "machine": machine, "seconds": results}
+        if arguments.baseline.exists():
+            previous = json.loads(arguments.baseline.read_text())
+            if previous.get("version") == 1:
+                baseline["seconds"] = {**previous["seconds"], **results}
+        arguments.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Saved {len(results)} timings to {arguments.baseline}")
+    elif arguments.command == "compare":
+        sys.exit(compare(results, baseline_file=arguments.baseline, threshold=arguments.threshold, machine=machine))
+
+
+def compare(results: dict[str, float], *, baseline_file: Path, threshold: float, machine: dict[str, str]) -> int:
+    data = json.loads(baseline_file.read_text())
+    if not isinstance(data, dict) or data.get("version") != 1 or not isinstance(data.get("seconds"), dict):
+        raise ValueError(f"Unsupported baseline file format: {baseline_file}")
+    if data.get("machine") != machine:
+        print(f"Baseline was recorded on {data.get('machine')}; this machine is {machine}")
+
+    regressions = 0
+    print(f"\n{'case':<32} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, seconds in results.items():
+        if (baseline := data["seconds"].get(key)) is None:
+            print(f"{key:<32} {'-':>12} {seconds * 1000:>9.3f} ms {'new':>8}")
+            continue
+        change = seconds / baseline - 1
+        regressed = change > threshold
+        regressions += regressed
+        print(
+            f"{key:<32} {baseline * 1000:>9.3f} ms {seconds * 1000:>9.3f} ms {change:>+7.0%}"
+            + ("  REGRESSED" if regressed else "")
+        )
+    if regressions:
+        print(f"\n{regressions} cases regressed by more than {threshold:.0%}")
+        return 1
+    print(f"\nNo case regressed by more than {threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
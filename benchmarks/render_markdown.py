@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from report import render_markdown  # noqa: E402
+
+
+def synthetic_report(repos: int, *, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    topics = [f"topic-{index}" for index in range(max(repos // 10, 20))]
+    weights = [1 / (rank + 1) for rank in range(len(topics))]
+    entries = [
+        {
+            "name": f"org/repo-{index:05d}",
+            "url": f"https://github.com/org/repo-{index:05d}",
+            "commit_count": rng.randint(1, 50),
+            "summary": f"Summary {index}",
+            "description": None,
+            "topics": sorted(set(rng.choices(topics, weights=weights, k=rng.randint(0, 6)))),
+            "commits": [],
+        }
+        for index in range(repos)
+    ]
+    return {
+        "total_repos_count": repos,
+        "active_repos_count": repos,
+        "total_commits_count": sum(entry["commit_count"] for entry in entries),
+        "repos": entries,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure markdown rendering time as active repos grow")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2500, 5000, 10000])
+    parser.add_argument("--seed", type=int, default=17)
+    arguments = parser.parse_args()
+
+    print("Markdown rendering")
+    for size in arguments.sizes:
+        report = synthetic_report(size, seed=arguments.seed)
+        started = time.perf_counter()
+        markdown = render_markdown(report)
+        elapsed = time.perf_counter() - started
+        print(f"{size:>8,} repos {len(markdown):>12,} chars {elapsed:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
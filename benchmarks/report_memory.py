@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from json_stream import write_json  # noqa: E402
+from report import (  # noqa: E402
+    iter_json_feed_items,
+    iter_markdown,
+    json_feed,
+    render_json_feed,
+    render_markdown,
+)
+
+NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+TOPICS = ["python", "rust", "go", "cli", "ai", "database", "web", "devtools"]
+
+
+def entries(repos: int, commits: int) -> Iterator[dict[str, Any]]:
+    for repo in range(repos):
+        name = f"org/repo-{repo}"
+        yield {
+            "name": name,
+            "url": f"https://github.com/{name}",
+            "commit_count": commits,
+            "summary": f"Summary of the changes in {name}",
+            "description": f"Description of {name}",
+            "commits": [
+                {
+                    "sha": f"{repo:08x}{index:032x}",
+                    "message": f"Change {index} in {name}\n\nLonger description of the change.",
+                    "date": "2026-07-17T07:00:00Z",
+                }
+                for index in range(commits)
+            ],
+            "topics": [TOPICS[repo % len(TOPICS)], TOPICS[(repo * 3) % len(TOPICS)]],
+        }
+
+
+def document(repos: int, commits: int, rows: Iterator[dict[str, Any]] | list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "total_repos_count": repos,
+        "active_repos_count": repos,
+        "total_commits_count": repos * commits,
+        "repos": rows,
+    }
+
+
+def whole_documents(directory: Path, repos: int, commits: int) -> None:
+    report = document(repos, commits, list(entries(repos, commits)))
+    (directory / "report.json").write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    (directory / "report.md").write_text(render_markdown(report), encoding="utf-8")
+    feed = render_json_feed(report, published_at=NOW)
+    (directory / "feed.json").write_text(json.dumps(feed, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def streamed(directory: Path, repos: int, commits: int) -> None:
+    write_json(directory / "report.json", document(repos, commits, entries(repos, commits)))
+    with (directory / "report.md").open("w", encoding="utf-8") as markdown:
+        markdown.writelines(iter_markdown(document(repos, commits, entries(repos, commits))))
+    write_json(directory / "feed.json", json_feed(iter_json_feed_items(entries(repos, commits), published_at=NOW)))
+
+
+def measure(name: str, run: Callable[[Path, int, int], None], repos: int, commits: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        tracemalloc.start()
+        started = time.perf_counter()
+        run(Path(directory), repos, commits)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{name:<10} {repos:>7} repos {peak:>14,} bytes peak {elapsed:>8.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare peak memory of whole-document and streamed report writes")
+    parser.add_argument("--repos", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--commits", type=int, default=30)
+    arguments = parser.parse_args()
+
+    print(f"Report artifacts with {arguments.commits} commits per repo")
+    for repos in arguments.repos:
+        measure("whole", whole_documents, repos, arguments.commits)
+        measure("streamed", streamed, repos, arguments.commits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import httpx  # noqa: E402
+from commit_feed import CommitFeed, FetchedCommits  # noqa: E402
+from github_client import GitHubClient  # noqa: E402
+
+NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+
+
+def written_bytes() -> int:
+    for line in Path("/proc/self/io").read_text().splitlines():
+        if line.startswith("wchar:"):
+            return int(line.split()[1])
+    raise RuntimeError("/proc/self/io has no wchar counter")
+
+
+def rewrite_per_repo(directory: Path, repos: int) -> None:
+    watermark_file = directory / "watermarks.json"
+    watermarks: dict[str, str] = {}
+    for index in range(repos):
+        watermarks[f"org/repo-{index:05d}"] = (NOW - timedelta(minutes=index)).isoformat()
+        data = {"version": 2, "watermarks": dict(sorted(watermarks.items()))}
+        temporary_file = watermark_file.with_suffix(".json.tmp")
+        temporary_file.write_text(json.dumps(data, indent=2) + "\n")
+        temporary_file.replace(watermark_file)
+
+
+async def journal_then_flush(directory: Path, repos: int) -> None:
+    def no_request(request: httpx.Request) -> httpx.Response:
+        raise AssertionError(f"Unexpected request: {request.url}")
+
+    async with GitHubClient("token", transport=httpx.MockTransport(no_request)) as transport:
+        feed = CommitFeed(transport, watermark_file=directory / "watermarks.json", now=lambda: NOW)
+        for index in range(repos):
+            await feed.advance(
+                FetchedCommits(
+                    repo_name=f"org/repo-{index:05d}",
+                    commits=[],
+                    watermark=NOW - timedelta(minutes=index),
+                )
+            )
+        await feed.flush()
+
+
+def measure(name: str, run: Callable[[Path, int], None], repos: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        before = written_bytes()
+        started = time.perf_counter()
+        run(Path(directory), repos)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<20} {written_bytes() - before:>14,} bytes {elapsed:>8.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare watermark write volume per run")
+    parser.add_argument("--repos", type=int, default=5000)
+    arguments = parser.parse_args()
+
+    print(f"Watermark writes for {arguments.repos} repos")
+    measure("rewrite per repo", rewrite_per_repo, arguments.repos)
+    measure(
+        "journal + flush",
+        lambda directory, repos: asyncio.run(journal_then_flush(directory, repos)),
+        arguments.repos,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+from commit_feed import FetchedCommits
+from log import logger
+from records import Commit, Repo, parse_datetime
+
+
+class RunCheckpoint:
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self.selected_repos: list[Repo] | None = None
+        self.fetched: dict[str, FetchedCommits] = {}
+        self.summaries: dict[str, str | None] = {}
+        self._load()
+
+    def start(self, repos: Sequence[Repo]) -> None:
+        self.selected_repos = list(repos)
+        self.fetched = {}
+        self.summaries = {}
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._path.write_text(
+            json.dumps({"selected": [repo.to_json() for repo in repos]}, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+
+    def record_fetch(self, fetched: FetchedCommits) -> None:
+        if fetched.repo_name in self.fetched:
+            return
+        self.fetched[fetched.repo_name] = fetched
+        record: dict[str, Any] = {
+            "fetched": fetched.repo_name,
+            "commits": [commit.to_json() for commit in fetched.commits],
+        }
+        if fetched.total_count is not None:
+            record["commit_count"] = fetched.total_count
+        if fetched.watermark is not None:
+            record["watermark"] = fetched.watermark.isoformat()
+        if fetched.head is not None:
+            record["head"] = fetched.head
+        if fetched.checked_at is not None:
+            record["checked"] = fetched.checked_at.isoformat()
+        self._append(record)
+
+    def release(self, repo_name: str) -> None:
+        self.fetched.pop(repo_name, None)
+
+    def record_summary(self, repo_name: str, summary: str | None) -> None:
+        if repo_name in self.summaries:
+            return
+        self.summaries[repo_name] = summary
+        self._append({"summarized": repo_name, "summary": summary})
+
+    def clear(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+    def _append(self, record: Mapping[str, Any]) -> None:
+        with self._path.open("a", encoding="utf-8") as checkpoint:
+            checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _load(self) -> None:
+        if not self._path.exists():
+            return
+
+        lines = self._path.read_text(encoding="utf-8").splitlines()
+        for number, line in enumerate(lines, start=1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if number == len(lines):
+                    logger.warning("Ignoring truncated last checkpoint record in %s", self._path)
+                    break
+                raise
+            if "selected" in record:
+                self.selected_repos = [Repo.from_github(repo) for repo in record["selected"]]
+            elif "fetched" in record:
+                self.fetched[record["fetched"]] = FetchedCommits(
+                    repo_name=record["fetched"],
+                    commits=[Commit.from_github(commit) for commit in record["commits"]],
+                    watermark=parse_datetime(record["watermark"]) if "watermark" in record else None,
+                    head=record.get("head"),
+                    total_count=record.get("commit_count"),
+                    checked_at=parse_datetime(record["checked"]) if "checked" in record else None,
+                )
+            elif "summarized" in record:
+                self.summaries[record["summarized"]] = record["summary"]
+            else:
+                raise ValueError(f"Unsupported checkpoint record in {self._path}")
@@ -1,20 +1,61 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from collections.abc import Callable, Mapping
-from datetime import datetime, timedelta, timezone
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from contextlib import aclosing
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import httpx
-from github_client import GitHubClient
+from github_client import GitHubClient, is_rate_limited
+from json_stream import iter_json_array
+from log import logger
+from records import Commit, Repo, as_utc, parse_datetime
+from state_store import StateStore
+
+CommitBackend = Literal["rest", "graphql", "compare"]
+CommitProbe = Literal["none", "head", "search"]
+
+_HISTORY_SELECTION = """r{index}: repository(owner: $owner{index}, name: $name{index}) {{
+  defaultBranchRef {{
+    target {{
+      ... on Commit {{
+        history(first: 100, since: $since{index}) {{
+          pageInfo {{ hasNextPage }}
+          nodes {{ oid message authoredDate committedDate author {{ user {{ login }} }} }}
+        }}
+      }}
+    }}
+  }}
+}}"""
 
 
 class RateLimitError(RuntimeError):
     pass
 
 
+class FetchStopped(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class FetchedCommits:
+    repo_name: str
+    commits: list[Commit]
+    watermark: datetime | None
+    head: str | None = None
+    total_count: int | None = None
+    checked_at: datetime | None = None
+
+    @property
+    def commit_count(self) -> int:
+        return self.total_count if self.total_count is not None else len(self.commits)
+
+
 class CommitFeed:
     def __init__(
         self,
@@ -23,134 +64,489 @@ class CommitFeed:
         watermark_file: Path = Path("watermarks.json"),
         now: Callable[[], datetime],
         freshness_window: timedelta = timedelta(days=3),
+        backend: CommitBackend = "rest",
+        graphql_batch_size: int = 25,
+        state_store: StateStore | None = None,
+        pushed_at_skew: timedelta = timedelta(minutes=5),
+        probe: CommitProbe = "none",
+        probe_batch_size: int = 25,
+        fetch_limit: int = 0,
     ) -> None:
         self._transport = transport
+        self._state_store = state_store
         self._watermark_file = watermark_file
-        self._now = _as_utc(now())
+        self._journal_file = watermark_file.with_suffix(f"{watermark_file.suffix}.journal")
+        self._journal_entries = 0
+        self._now = as_utc(now())
         self._freshness_window = freshness_window
+        self._backend = backend
+        self._graphql_batch_size = graphql_batch_size
+        self._pushed_at_skew = pushed_at_skew
+        self._probe = probe
+        self._probe_batch_size = probe_batch_size
+        self._fetch_limit = fetch_limit
+        self._track_heads = backend == "compare" or probe == "head"
+        self._heads: dict[str, str] = {}
+        self._branch_heads: dict[str, str] = {}
+        self._checked: dict[str, datetime] = {}
         self._watermarks = self._load_watermarks()
+        self._prefetched: dict[str, list[Commit]] = {}
+        self._unchanged: set[str] = set()
+        self.requests_avoided = 0
+        self.fetches_skipped = 0
 
-    def is_active_repo(self, repo: Mapping[str, Any]) -> bool:
-        pushed_at = repo.get("pushed_at")
-        if not pushed_at:
+    def is_active_repo(self, repo: Repo) -> bool:
+        if repo.pushed_at is None:
             return False
-        return _parse_datetime(str(pushed_at)) > self._now - self._freshness_window
+        return repo.pushed_at > self._now - self._freshness_window
+
+    async def new_commits(self, repo: Repo) -> list[Commit]:
+        fetched = await self.fetch(repo)
+        await self.advance(fetched)
+        return fetched.commits
+
+    async def prepare(self, repos: Sequence[Repo]) -> None:
+        if self._probe == "head":
+            await self._probe_heads(repos)
+        elif self._probe == "search":
+            await self._probe_search(repos)
+        if self._backend != "graphql":
+            return
+        repo_names = [
+            repo.full_name
+            for repo in repos
+            if not self._unpushed_since_check(repo) and repo.full_name not in self._unchanged
+        ]
+        batches = [
+            repo_names[start : start + self._graphql_batch_size]
+            for start in range(0, len(repo_names), self._graphql_batch_size)
+        ]
+        for prefetched in await asyncio.gather(*(self._prefetch_history(batch) for batch in batches)):
+            self._prefetched.update(prefetched)
+
+    async def fetch(self, repo: Repo, *, stop: asyncio.Event | None = None) -> FetchedCommits:
+        repo_name = repo.full_name
+        if self._unpushed_since_check(repo):
+            self.requests_avoided += 1
+            return FetchedCommits(repo_name=repo_name, commits=[], watermark=None)
+        if repo_name in self._unchanged:
+            self.fetches_skipped += 1
+            return FetchedCommits(repo_name=repo_name, commits=[], watermark=None)
+        modified_since, has_watermark = self._modified_since(repo_name)
+        anchor = self._heads.get(repo_name)
+        if self._backend == "compare" and has_watermark and anchor and repo.default_branch:
+            if (compared := await self._fetch_compare(repo, anchor, modified_since, stop=stop)) is not None:
+                return compared
+        if (prefetched := self._prefetched.pop(repo_name, None)) is not None:
+            raw_commits, last_modified, listed_count = prefetched, None, None
+        else:
+            raw_commits, last_modified, listed_count = await self._fetch_pages(
+                repo_name,
+                modified_since=modified_since,
+                has_watermark=has_watermark,
+                stop=stop,
+            )
+
+        if last_modified is not None:
+            next_watermark = last_modified
+        elif raw_commits:
+            next_watermark = max(commit.committed_at for commit in raw_commits)
+        else:
+            next_watermark = None
+
+        comparison = (
+            (lambda committed_at: committed_at > modified_since)
+            if has_watermark
+            else (lambda committed_at: committed_at >= modified_since)
+        )
+        commits = [commit for commit in raw_commits if not commit.is_bot and comparison(commit.committed_at)]
+        total_count = (
+            len(commits) + round((listed_count - len(raw_commits)) * len(commits) / len(raw_commits))
+            if listed_count is not None and raw_commits
+            else None
+        )
+        return self._capped(
+            FetchedCommits(
+                repo_name=repo_name,
+                commits=commits,
+                watermark=next_watermark,
+                head=raw_commits[0].sha if self._track_heads and raw_commits else None,
+                total_count=total_count,
+                checked_at=self._now,
+            )
+        )
+
+    def _capped(self, fetched: FetchedCommits) -> FetchedCommits:
+        if not self._fetch_limit or len(fetched.commits) <= self._fetch_limit:
+            return fetched
+        return replace(fetched, commits=fetched.commits[: self._fetch_limit], total_count=fetched.commit_count)
+
+    async def _probe_heads(self, repos: Sequence[Repo]) -> None:
+        candidates = [
+            repo
+            for repo in repos
+            if repo.default_branch
+            and repo.full_name in self._heads
+            and self._modified_since(repo.full_name)[1]
+            and not self._unpushed_since_check(repo)
+        ]
+        for start in range(0, len(candidates), self._probe_batch_size):
+            batch = candidates[start : start + self._probe_batch_size]
+            heads = await asyncio.gather(*(self._probe_head(repo) for repo in batch))
+            self._branch_heads.update(
+                (repo.full_name, head) for repo, head in zip(batch, heads, strict=True) if head is not None
+            )
+            self._unchanged.update(
+                repo.full_name for repo, head in zip(batch, heads, strict=True) if head == self._heads[repo.full_name]
+            )
+
+    async def _probe_search(self, repos: Sequence[Repo]) -> None:
+        batches: list[tuple[list[str], datetime]] = []
+        for repo in repos:
+            if repo.fork or self._unpushed_since_check(repo):
+                continue
+            modified_since = self._modified_since(repo.full_name)[0]
+            if batches and len(batches[-1][0]) < self._probe_batch_size:
+                names, bound = batches[-1]
+                batches[-1] = ([*names, repo.full_name], min(bound, modified_since))
+            else:
+                batches.append(([repo.full_name], modified_since))
+
+        results = await asyncio.gather(*(self._search_active(names, bound) for names, bound in batches))
+        for (names, _), active in zip(batches, results, strict=True):
+            if active is not None:
+                self._unchanged.update(name for name in names if name not in active)
+
+    async def _search_active(self, repo_names: Sequence[str], since: datetime) -> set[str] | None:
+        active: set[str] = set()
+        remaining = list(repo_names)
+        while remaining:
+            response = await self._transport.search_commits(_search_query(remaining, since))
+            if is_rate_limited(response) or response.is_error:
+                logger.warning("Commit search failed with %s; fetching its repos", response.status_code)
+                return None
+            data = response.json()
+            found = {item["repository"]["full_name"] for item in data["items"]}
+            active |= found
+            if not data["incomplete_results"] and data["total_count"] <= len(data["items"]):
+                return active
+            if not found:
+                return None
+            remaining = [name for name in remaining if name not in found]
+        return active
+
+    async def _probe_head(self, repo: Repo) -> str | None:
+        try:
+            return await self._transport.branch_head(repo.full_name, str(repo.default_branch))
+        except httpx.HTTPStatusError as error:
+            logger.debug("Head probe for %s failed with %s", repo.full_name, error.response.status_code)
+            return None
+
+    async def _fetch_compare(
+        self, repo: Repo, anchor: str, modified_since: datetime, *, stop: asyncio.Event | None
+    ) -> FetchedCommits | None:
+        repo_name = repo.full_name
+        if (head := self._branch_heads.get(repo_name)) is None:
+            _check_stop(stop, repo_name)
+            head = await self._probe_head(repo)
+        if head is None:
+            return None
+        if head == anchor:
+            return FetchedCommits(repo_name=repo_name, commits=[], watermark=None)
+
+        _check_stop(stop, repo_name)
+        response = await self._transport.compare_commits(repo_name, base=anchor, head=head)
+        if is_rate_limited(response):
+            raise RateLimitError(f"GitHub rate limit reached while comparing {repo_name}")
+        if response.is_error:
+            logger.debug("Compare for %s failed with %s; using dates", repo_name, response.status_code)
+            return None
+
+        comparison = response.json()
+        if comparison["status"] == "identical":
+            return FetchedCommits(repo_name=repo_name, commits=[], watermark=None)
+        if comparison["status"] != "ahead" or len(comparison["commits"]) != comparison["total_commits"]:
+            logger.debug("Compare for %s is %s; using dates", repo_name, comparison["status"])
+            return None
 
-    async def new_commits(self, repo: Mapping[str, Any]) -> list[dict[str, Any]]:
-        repo_name = str(repo["full_name"])
+        commits = [Commit.from_github(item) for item in reversed(comparison["commits"])]
+        return self._capped(
+            FetchedCommits(
+                repo_name=repo_name,
+                commits=[commit for commit in commits if not commit.is_bot],
+                watermark=max(modified_since, *(commit.committed_at for commit in commits)),
+                head=commits[0].sha,
+                checked_at=self._now,
+            )
+        )
+
+    def _unpushed_since_check(self, repo: Repo) -> bool:
+        checked_at = self._checked.get(repo.full_name)
+        return (
+            checked_at is not None
+            and repo.pushed_at is not None
+            and repo.pushed_at + self._pushed_at_skew <= checked_at
+        )
+
+    def _modified_since(self, repo_name: str) -> tuple[datetime, bool]:
         cutoff = self._now - self._freshness_window
         watermark = self._watermarks.get(repo_name)
         if watermark is not None and watermark >= cutoff:
-            has_watermark = True
-            modified_since = watermark
-        else:
-            has_watermark = False
-            modified_since = cutoff
+            return watermark, True
+        return cutoff, False
 
-        raw_commits: list[dict[str, Any]] = []
+    async def _fetch_pages(
+        self,
+        repo_name: str,
+        *,
+        modified_since: datetime,
+        has_watermark: bool,
+        stop: asyncio.Event | None,
+    ) -> tuple[list[Commit], datetime | None, int | None]:
+        raw_commits: list[Commit] = []
         last_modified: datetime | None = None
+        listed_count: int | None = None
         page = 1
         while True:
+            _check_stop(stop, repo_name)
             response = await self._transport.request_commits(
                 repo_name,
                 modified_since=modified_since,
                 page=page,
+                per_page=min(self._fetch_limit, 100) if self._fetch_limit else 100,
+                since=modified_since,
+                stream=True,
             )
-            if response.status_code == 304:
-                break
-            if _is_rate_limit(response):
-                raise RateLimitError(f"GitHub rate limit reached while fetching {repo_name}")
-            response.raise_for_status()
+            try:
+                if response.status_code == 304:
+                    break
+                if is_rate_limited(response):
+                    raise RateLimitError(f"GitHub rate limit reached while fetching {repo_name}")
+                response.raise_for_status()
 
-            page_commits = response.json()
-            if not isinstance(page_commits, list):
-                raise TypeError("GitHub commits response must be a list")
-            raw_commits.extend(page_commits)
+                reached_cutoff = False
+                async with aclosing(iter_json_array(response.aiter_bytes())) as items:
+                    async for item in items:
+                        commit = Commit.from_github(item)
+                        raw_commits.append(commit)
+                        if (
+                            commit.committed_at <= modified_since
+                            if has_watermark
+                            else commit.committed_at < modified_since
+                        ):
+                            reached_cutoff = True
+                            break
+            finally:
+                await response.aclose()
 
             if last_modified_value := response.headers.get("Last-Modified"):
-                page_last_modified = _as_utc(parsedate_to_datetime(last_modified_value))
+                page_last_modified = as_utc(parsedate_to_datetime(last_modified_value))
                 last_modified = (
                     max(last_modified, page_last_modified) if last_modified is not None else page_last_modified
                 )
-            reached_cutoff = any(
-                _commit_datetime(commit) <= modified_since
-                if has_watermark
-                else _commit_datetime(commit) < modified_since
-                for commit in page_commits
-            )
             if reached_cutoff or "next" not in response.links:
                 break
+            if self._fetch_limit and len(raw_commits) >= self._fetch_limit:
+                _check_stop(stop, repo_name)
+                listed_count = await self._count_commits(repo_name, modified_since=modified_since)
+                break
             page += 1
+        return raw_commits, last_modified, listed_count
 
-        if last_modified is not None:
-            next_watermark = last_modified
-        elif raw_commits:
-            next_watermark = max(_commit_datetime(commit) for commit in raw_commits)
-        else:
-            next_watermark = None
+    async def _count_commits(self, repo_name: str, *, modified_since: datetime) -> int | None:
+        response = await self._transport.request_commits(
+            repo_name,
+            modified_since=modified_since,
+            page=1,
+            per_page=1,
+            since=modified_since,
+        )
+        if is_rate_limited(response):
+            raise RateLimitError(f"GitHub rate limit reached while counting {repo_name}")
+        if response.status_code != 200:
+            logger.warning(
+                "Counting commits for %s failed with %s; reporting only the fetched commits",
+                repo_name,
+                response.status_code,
+            )
+            return None
+        if last := response.links.get("last"):
+            return int(httpx.URL(last["url"]).params["page"])
+        return len(response.json())
 
-        if next_watermark is not None:
-            self._watermarks[repo_name] = next_watermark
-            self._save_watermarks()
+    async def _prefetch_history(self, repo_names: Sequence[str]) -> dict[str, list[Commit]]:
+        selections: list[str] = []
+        declarations: list[str] = []
+        variables: dict[str, Any] = {}
+        for index, repo_name in enumerate(repo_names):
+            owner, name = repo_name.split("/", 1)
+            selections.append(_HISTORY_SELECTION.format(index=index))
+            declarations.append(f"$owner{index}: String!, $name{index}: String!, $since{index}: GitTimestamp!")
+            variables |= {
+                f"owner{index}": owner,
+                f"name{index}": name,
+                f"since{index}": self._modified_since(repo_name)[0].isoformat(),
+            }
 
-        comparison = (
-            (lambda committed_at: committed_at > modified_since)
-            if has_watermark
-            else (lambda committed_at: committed_at >= modified_since)
+        response = await self._transport.graphql(
+            f"query({', '.join(declarations)}) {{\n{chr(10).join(selections)}\n}}",
+            variables,
+        )
+        if is_rate_limited(response) or response.is_error:
+            logger.warning("GraphQL history query failed with %s; using REST for its repos", response.status_code)
+            return {}
+
+        data = response.json().get("data") or {}
+        prefetched: dict[str, list[Commit]] = {}
+        for index, repo_name in enumerate(repo_names):
+            history = _history(data.get(f"r{index}"))
+            if history is not None and not history["pageInfo"]["hasNextPage"]:
+                prefetched[repo_name] = [_graphql_commit(node) for node in history["nodes"]]
+        return prefetched
+
+    async def advance(self, fetched: FetchedCommits) -> None:
+        if fetched.watermark is None:
+            return
+        self._remember(fetched)
+        if self._state_store is not None:
+            await asyncio.to_thread(self._store_watermarks, [fetched])
+            return
+        await asyncio.to_thread(
+            self._append_journal, fetched.repo_name, fetched.watermark, fetched.head, fetched.checked_at
         )
-        return [commit for commit in raw_commits if not _is_bot(commit) and comparison(_commit_datetime(commit))]
+        if self._journal_entries >= max(len(self._watermarks), 1024):
+            await self.flush()
+
+    async def advance_all(self, fetched: Iterable[FetchedCommits]) -> None:
+        advanced = [item for item in fetched if item.watermark is not None]
+        for item in advanced:
+            self._remember(item)
+        if self._state_store is not None and advanced:
+            await asyncio.to_thread(self._store_watermarks, advanced)
+        await self.flush()
+
+    async def flush(self) -> None:
+        await asyncio.to_thread(self._save_watermarks, dict(self._watermarks), dict(self._heads), dict(self._checked))
+
+    def _remember(self, fetched: FetchedCommits) -> None:
+        if fetched.watermark is None:
+            return
+        self._watermarks[fetched.repo_name] = fetched.watermark
+        if fetched.head is not None:
+            self._heads[fetched.repo_name] = fetched.head
+        if fetched.checked_at is not None:
+            self._checked[fetched.repo_name] = fetched.checked_at
+
+    def _store_watermarks(self, fetched: Sequence[FetchedCommits]) -> None:
+        if self._state_store is None:
+            return
+        for item in fetched:
+            if item.watermark is None:
+                continue
+            self._state_store.save_watermark(
+                item.repo_name,
+                item.watermark.isoformat(),
+                head=item.head,
+                checked_at=item.checked_at.isoformat() if item.checked_at is not None else None,
+            )
 
     def _load_watermarks(self) -> dict[str, datetime]:
-        if not self._watermark_file.exists():
-            return {}
+        watermarks: dict[str, datetime] = {}
+        if self._watermark_file.exists():
+            data = json.loads(self._watermark_file.read_text())
+            if not isinstance(data, dict) or data.get("version") != 2 or not isinstance(data.get("watermarks"), dict):
+                raise ValueError("Unsupported watermark file format")
+            watermarks = {repo: parse_datetime(value) for repo, value in data["watermarks"].items()}
+            heads = dict(data.get("heads", {}))
+            checked = {repo: parse_datetime(value) for repo, value in data.get("checked", {}).items()}
+        else:
+            heads = {}
+            checked = {}
+
+        if self._journal_file.exists():
+            lines = self._journal_file.read_text().splitlines()
+            for number, line in enumerate(lines, start=1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    if number == len(lines):
+                        break
+                    raise
+                watermarks[entry["repo"]] = parse_datetime(entry["watermark"])
+                if "head" in entry:
+                    heads[entry["repo"]] = entry["head"]
+                if "checked" in entry:
+                    checked[entry["repo"]] = parse_datetime(entry["checked"])
+                self._journal_entries += 1
 
-        data = json.loads(self._watermark_file.read_text())
-        if not isinstance(data, dict) or data.get("version") != 2 or not isinstance(data.get("watermarks"), dict):
-            raise ValueError("Unsupported watermark file format")
+        if self._state_store is not None:
+            watermarks |= {repo: parse_datetime(value) for repo, value in self._state_store.watermarks().items()}
+            heads |= self._state_store.heads()
+            checked |= {repo: parse_datetime(value) for repo, value in self._state_store.checked().items()}
 
         cutoff = self._now - self._freshness_window
-        watermarks = {repo: _parse_datetime(value) for repo, value in data["watermarks"].items()}
-        return {repo: timestamp for repo, timestamp in watermarks.items() if timestamp >= cutoff}
+        live = {repo: timestamp for repo, timestamp in watermarks.items() if timestamp >= cutoff}
+        self._heads = {repo: sha for repo, sha in heads.items() if repo in live}
+        self._checked = {repo: timestamp for repo, timestamp in checked.items() if repo in live}
+        return live
 
-    def _save_watermarks(self) -> None:
+    def _append_journal(
+        self, repo_name: str, watermark: datetime, head: str | None, checked_at: datetime | None
+    ) -> None:
+        entry = {"repo": repo_name, "watermark": watermark.isoformat()}
+        if head is not None:
+            entry["head"] = head
+        if checked_at is not None:
+            entry["checked"] = checked_at.isoformat()
+        self._journal_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._journal_file.open("a") as journal:
+            journal.write(json.dumps(entry) + "\n")
+        self._journal_entries += 1
+
+    def _save_watermarks(
+        self, watermarks: Mapping[str, datetime], heads: Mapping[str, str], checked: Mapping[str, datetime]
+    ) -> None:
         self._watermark_file.parent.mkdir(parents=True, exist_ok=True)
-        data = {
+        data: dict[str, Any] = {
             "version": 2,
-            "watermarks": {repo: timestamp.isoformat() for repo, timestamp in sorted(self._watermarks.items())},
+            "watermarks": {repo: timestamp.isoformat() for repo, timestamp in sorted(watermarks.items())},
         }
+        if heads:
+            data["heads"] = dict(sorted(heads.items()))
+        if checked:
+            data["checked"] = {repo: timestamp.isoformat() for repo, timestamp in sorted(checked.items())}
         temporary_file = self._watermark_file.with_suffix(f"{self._watermark_file.suffix}.tmp")
         temporary_file.write_text(json.dumps(data, indent=2) + "\n")
         temporary_file.replace(self._watermark_file)
+        self._journal_file.unlink(missing_ok=True)
+        self._journal_entries = 0
 
 
-def _commit_datetime(commit: Mapping[str, Any]) -> datetime:
-    return _parse_datetime(str(commit["commit"]["committer"]["date"]))
-
-
-def _parse_datetime(value: str) -> datetime:
-    return _as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+def _check_stop(stop: asyncio.Event | None, repo_name: str) -> None:
+    if stop is not None and stop.is_set():
+        raise FetchStopped(f"Stopped fetching {repo_name}")
 
 
-def _as_utc(value: datetime) -> datetime:
-    if value.tzinfo is None:
-        raise ValueError("Timestamp must include a timezone")
-    return value.astimezone(timezone.utc)
+def _search_query(repo_names: Sequence[str], since: datetime) -> str:
+    qualifiers = " ".join(f"repo:{name}" for name in repo_names)
+    return f"{qualifiers} committer-date:>{since.strftime('%Y-%m-%dT%H:%M:%SZ')}"
 
 
-def _is_bot(commit: Mapping[str, Any]) -> bool:
-    author = commit.get("author")
-    if not isinstance(author, Mapping):
-        return True
-    return author.get("type") == "Bot" or "[bot]" in str(author.get("login", ""))
+def _history(repository: Any) -> dict[str, Any] | None:
+    try:
+        history = repository["defaultBranchRef"]["target"]["history"]
+    except (KeyError, TypeError):
+        return None
+    return history if isinstance(history, dict) else None
 
 
-def _is_rate_limit(response: httpx.Response) -> bool:
-    if response.status_code == 429:
-        return True
-    if response.status_code != 403:
-        return False
-    return (
-        response.headers.get("X-RateLimit-Remaining") == "0"
-        or "Retry-After" in response.headers
-        or "rate limit" in response.text.lower()
+def _graphql_commit(node: Mapping[str, Any]) -> Commit:
+    user = (node.get("author") or {}).get("user")
+    return Commit(
+        sha=str(node["oid"]),
+        message=str(node["message"]),
+        authored_date=str(node["authoredDate"]),
+        committed_at=parse_datetime(str(node["committedDate"])),
+        author_login=user["login"] if user else None,
+        author_type="User" if user else None,
     )
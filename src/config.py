@@ -4,6 +4,10 @@ from collections.abc import Mapping
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from commit_feed import CommitBackend, CommitProbe
 
 
 @dataclass(frozen=True, slots=True)
@@ -15,6 +19,16 @@ class Config:
     summarizer_model: str | None
     is_ci: bool
     github_output: Path | None
+    fetch_concurrency: int = 1
+    summarize_concurrency: int = 1
+    summary_batch_size: int = 1
+    commit_backend: CommitBackend = "rest"
+    rate_limit_wait: float = 900
+    state_db: Path | None = None
+    starred_page_tolerance: int = 1
+    starred_page_concurrency: int = 1
+    commit_probe: CommitProbe = "none"
+    commit_fetch_limit: int = 0
 
     @classmethod
     def from_environment(
@@ -35,6 +49,20 @@ class Config:
         repo_limit_value = environment.get("REPO_LIMIT", "").strip()
         empty_streak_value = environment.get("EMPTY_REPO_CONSECUTIVE_LIMIT", "").strip()
         github_output_value = environment.get("GITHUB_OUTPUT")
+        state_db_value = environment.get("STATE_DB")
+        rate_limit_wait_value = environment.get("RATE_LIMIT_MAX_WAIT", "").strip()
+        commit_backend = environment.get("COMMIT_BACKEND", "").strip() or "rest"
+        if commit_backend not in ("rest", "graphql", "compare"):
+            raise ValueError("COMMIT_BACKEND must be rest, graphql or compare")
+        commit_probe = environment.get("COMMIT_PROBE", "").strip() or "none"
+        if commit_probe not in ("none", "head", "search"):
+            raise ValueError("COMMIT_PROBE must be none, head or search")
+        fetch_concurrency_value = environment.get("FETCH_CONCURRENCY", "").strip()
+        summarize_concurrency_value = environment.get("SUMMARIZE_CONCURRENCY", "").strip()
+        summary_batch_size_value = environment.get("SUMMARY_BATCH_SIZE", "").strip()
+        starred_page_tolerance_value = environment.get("STARRED_PAGE_TOLERANCE", "").strip()
+        starred_page_concurrency_value = environment.get("STARRED_PAGE_CONCURRENCY", "").strip()
+        commit_fetch_limit_value = environment.get("COMMIT_FETCH_LIMIT", "").strip()
 
         return cls(
             github_token=github_token,
@@ -44,4 +72,14 @@ class Config:
             summarizer_model=environment.get("SUMMARIZER_MODEL") or None,
             is_ci=is_ci,
             github_output=Path(github_output_value) if github_output_value else None,
+            fetch_concurrency=int(fetch_concurrency_value) if fetch_concurrency_value else 1,
+            summarize_concurrency=(int(summarize_concurrency_value) if summarize_concurrency_value else 1),
+            summary_batch_size=(int(summary_batch_size_value) if summary_batch_size_value else 1),
+            commit_backend=cast("CommitBackend", commit_backend),
+            rate_limit_wait=float(rate_limit_wait_value) if rate_limit_wait_value else 900,
+            state_db=Path(state_db_value) if state_db_value else None,
+            starred_page_tolerance=(int(starred_page_tolerance_value) if starred_page_tolerance_value else 1),
+            starred_page_concurrency=(int(starred_page_concurrency_value) if starred_page_concurrency_value else 1),
+            commit_probe=cast("CommitProbe", commit_probe),
+            commit_fetch_limit=int(commit_fetch_limit_value) if commit_fetch_limit_value else 0,
         )
@@ -1,24 +1,140 @@
 from __future__ import annotations
 
-from collections.abc import AsyncIterator
-from datetime import datetime
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from email.utils import format_datetime
+from pathlib import Path
 from typing import Any
 
 import httpx
 from log import logger
 
 
+class ETagCache:
+    def __init__(self, cache_file: Path) -> None:
+        self._cache_file = cache_file
+        self._entries = self._load_entries()
+        self._changed = False
+
+    def get(self, url: str) -> tuple[str, Any] | None:
+        entry = self._entries.get(url)
+        return (entry["etag"], entry["body"]) if entry is not None else None
+
+    def store(self, url: str, etag: str, body: Any) -> None:
+        self._entries[url] = {"etag": etag, "body": body}
+        self._changed = True
+
+    def save(self) -> None:
+        if not self._changed:
+            return
+        self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": 1, "entries": dict(sorted(self._entries.items()))}
+        temporary_file = self._cache_file.with_suffix(f"{self._cache_file.suffix}.tmp")
+        temporary_file.write_text(json.dumps(data) + "\n")
+        temporary_file.replace(self._cache_file)
+        self._changed = False
+
+    def _load_entries(self) -> dict[str, dict[str, Any]]:
+        if not self._cache_file.exists():
+            return {}
+
+        data = json.loads(self._cache_file.read_text())
+        if not isinstance(data, dict) or data.get("version") != 1 or not isinstance(data.get("entries"), dict):
+            raise ValueError("Unsupported ETag cache file format")
+        return data["entries"]
+
+
+@dataclass(slots=True)
+class _RateLimitBudget:
+    limit: int | None = None
+    remaining: int | None = None
+    reset_at: float | None = None
+
+
+class _RateLimitScheduler:
+    def __init__(
+        self,
+        *,
+        deadline: float,
+        clock: Callable[[], float],
+        sleep: Callable[[float], Awaitable[None]],
+        pacing_fraction: float = 0.1,
+    ) -> None:
+        self._deadline = deadline
+        self._clock = clock
+        self._sleep = sleep
+        self._pacing_fraction = pacing_fraction
+        self._budgets: dict[str, _RateLimitBudget] = {}
+        self._pacing_locks: dict[str, asyncio.Lock] = {}
+
+    async def before_request(self, resource: str) -> None:
+        budget = self._budgets.get(resource)
+        if budget is None or budget.remaining is None or budget.reset_at is None or budget.limit is None:
+            return
+        if budget.remaining > budget.limit * self._pacing_fraction:
+            return
+
+        async with self._pacing_locks.setdefault(resource, asyncio.Lock()):
+            until_reset = max(budget.reset_at - self._clock(), 0)
+            delay = until_reset if budget.remaining <= 0 else until_reset / budget.remaining
+            if delay <= 0 or self._clock() + delay > self._deadline:
+                return
+            logger.info("Pacing %s requests: %s remaining, waiting %.1fs", resource, budget.remaining, delay)
+            await self._sleep(delay)
+            if budget.remaining <= 0:
+                budget.remaining = budget.limit
+            else:
+                budget.remaining -= 1
+
+    def observe(self, resource: str, response: httpx.Response) -> None:
+        headers = response.headers
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        budget = self._budgets.setdefault(headers.get("X-RateLimit-Resource", resource), _RateLimitBudget())
+        budget.remaining = int(headers["X-RateLimit-Remaining"])
+        if limit := headers.get("X-RateLimit-Limit"):
+            budget.limit = int(limit)
+        if reset := headers.get("X-RateLimit-Reset"):
+            budget.reset_at = float(reset)
+
+    async def backoff(self, response: httpx.Response, *, attempt: int) -> bool:
+        headers = response.headers
+        if retry_after := headers.get("Retry-After"):
+            delay = float(retry_after)
+        elif headers.get("X-RateLimit-Remaining") == "0" and (reset := headers.get("X-RateLimit-Reset")):
+            delay = max(float(reset) - self._clock(), 0) + 1
+        else:
+            delay = 60.0 * 2**attempt
+        if self._clock() + delay > self._deadline:
+            return False
+        logger.warning("GitHub rate limit hit on %s; retrying in %.0fs", response.request.url.path, delay)
+        await self._sleep(delay)
+        return True
+
+
 class GitHubClient:
     def __init__(
         self,
         token: str,
         *,
+        base_url: str = "https://api.github.com",
         timeout: float = 30,
         transport: httpx.AsyncBaseTransport | None = None,
+        etag_cache: ETagCache | None = None,
+        rate_limit_wait: float = 0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
     ) -> None:
+        self._etag_cache = etag_cache
+        self.starred_page_count: int | None = None
+        self._scheduler = _RateLimitScheduler(deadline=clock() + rate_limit_wait, clock=clock, sleep=sleep)
         self._client = httpx.AsyncClient(
-            base_url="https://api.github.com",
+            base_url=base_url,
             headers={
                 "Authorization": f"Bearer {token}",
                 "Accept": "application/vnd.github+json",
@@ -34,6 +150,8 @@ class GitHubClient:
 
     async def __aexit__(self, *_: object) -> None:
         await self._client.aclose()
+        if self._etag_cache is not None:
+            self._etag_cache.save()
 
     async def request_commits(
         self,
@@ -42,31 +160,136 @@ class GitHubClient:
         modified_since: datetime,
         page: int,
         per_page: int = 100,
+        since: datetime | None = None,
+        stream: bool = False,
     ) -> httpx.Response:
-        return await self._client.get(
-            f"/repos/{repo_full_name}/commits",
-            headers={"If-Modified-Since": format_datetime(modified_since, usegmt=True)},
-            params={"per_page": per_page, "page": page},
+        params: dict[str, Any] = {"per_page": per_page, "page": page}
+        if since is not None:
+            params["since"] = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return await self._send(
+            self._client.build_request(
+                "GET",
+                f"/repos/{repo_full_name}/commits",
+                headers={"If-Modified-Since": format_datetime(modified_since, usegmt=True)},
+                params=params,
+            ),
+            stream=stream,
         )
 
-    async def starred_repo_pages(self, *, per_page: int = 100) -> AsyncIterator[list[dict[str, Any]]]:
-        page = 1
-        while True:
-            logger.debug("Fetching starred repositories page %s", page)
-            response = await self._client.get(
-                "/user/starred",
-                params={
-                    "per_page": per_page,
-                    "page": page,
-                    "sort": "updated",
-                    "direction": "desc",
-                },
+    async def branch_head(self, repo_full_name: str, branch: str) -> str:
+        ref, _ = await self._get_revalidated(f"/repos/{repo_full_name}/git/ref/heads/{branch}", params={})
+        return str(ref["object"]["sha"])
+
+    async def search_commits(self, query: str, *, per_page: int = 100) -> httpx.Response:
+        return await self._send(
+            self._client.build_request("GET", "/search/commits", params={"q": query, "per_page": per_page})
+        )
+
+    async def compare_commits(self, repo_full_name: str, *, base: str, head: str) -> httpx.Response:
+        return await self._send(self._client.build_request("GET", f"/repos/{repo_full_name}/compare/{base}...{head}"))
+
+    async def graphql(self, query: str, variables: Mapping[str, Any]) -> httpx.Response:
+        return await self._send(
+            self._client.build_request("POST", "/graphql", json={"query": query, "variables": variables})
+        )
+
+    async def starred_repo_pages(
+        self, *, per_page: int = 100, concurrency: int = 1
+    ) -> AsyncGenerator[list[dict[str, Any]]]:
+        repos = await self._starred_page(1, per_page=per_page)
+        if not repos:
+            return
+        yield repos
+
+        last_page = self.starred_page_count if concurrency > 1 else None
+        if last_page is None:
+            page = 2
+            while repos := await self._starred_page(page, per_page=per_page):
+                yield repos
+                page += 1
+            return
+
+        pending: deque[asyncio.Task[list[dict[str, Any]]]] = deque()
+        remaining = iter(range(2, last_page + 1))
+        try:
+            while True:
+                while len(pending) < concurrency and (next_page := next(remaining, None)) is not None:
+                    pending.append(asyncio.create_task(self._starred_page(next_page, per_page=per_page)))
+                if not pending or not (repos := await pending.popleft()):
+                    return
+                yield repos
+        finally:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _starred_page(self, page: int, *, per_page: int) -> list[dict[str, Any]]:
+        logger.debug("Fetching starred repositories page %s", page)
+        repos, links = await self._get_revalidated(
+            "/user/starred",
+            params={
+                "per_page": per_page,
+                "page": page,
+                "sort": "updated",
+                "direction": "desc",
+            },
+        )
+        if not isinstance(repos, list):
+            raise TypeError("GitHub starred repositories response must be a list")
+        if page == 1 and (last := links.get("last")):
+            self.starred_page_count = int(httpx.URL(last["url"]).params.get("page", page))
+        return repos
+
+    async def _get_revalidated(
+        self, path: str, *, params: Mapping[str, Any]
+    ) -> tuple[Any, dict[str | None, dict[str, str]]]:
+        url = str(self._client.build_request("GET", path, params=params).url)
+        cached = self._etag_cache.get(url) if self._etag_cache is not None else None
+        response = await self._send(
+            self._client.build_request(
+                "GET",
+                path,
+                headers={"If-None-Match": cached[0]} if cached is not None else None,
+                params=params,
             )
-            response.raise_for_status()
-            repos = response.json()
-            if not isinstance(repos, list):
-                raise TypeError("GitHub starred repositories response must be a list")
-            if not repos:
-                return
-            yield repos
-            page += 1
+        )
+        if response.status_code == 304 and cached is not None:
+            logger.debug("Serving %s from ETag cache", url)
+            return cached[1], response.links
+        response.raise_for_status()
+        body = response.json()
+        if self._etag_cache is not None and (etag := response.headers.get("ETag")):
+            self._etag_cache.store(url, etag, body)
+        return body, response.links
+
+    async def _send(self, request: httpx.Request, *, stream: bool = False) -> httpx.Response:
+        resource = _rate_limit_resource(request.url.path)
+        attempt = 0
+        while True:
+            await self._scheduler.before_request(resource)
+            response = await self._client.send(request, stream=stream)
+            if stream and response.is_error:
+                await response.aread()
+            self._scheduler.observe(resource, response)
+            if not is_rate_limited(response) or not await self._scheduler.backoff(response, attempt=attempt):
+                return response
+            await response.aclose()
+            attempt += 1
+
+
+def is_rate_limited(response: httpx.Response) -> bool:
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+    return (
+        response.headers.get("X-RateLimit-Remaining") == "0"
+        or "Retry-After" in response.headers
+        or "rate limit" in response.text.lower()
+    )
+
+
+def _rate_limit_resource(path: str) -> str:
+    if path.startswith("/search/"):
+        return "search"
+    if path == "/graphql":
+        return "graphql"
+    return "core"
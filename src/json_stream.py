@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import codecs
+import json
+from collections.abc import AsyncGenerator, AsyncIterable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_SCALAR_ENDINGS = frozenset(f"{_WHITESPACE},]")
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncGenerator[Any]:
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    scanner = _ArrayScanner()
+    async for chunk in chunks:
+        for item in scanner.feed(text_decoder.decode(chunk), final=False):
+            yield item
+    for item in scanner.feed(text_decoder.decode(b"", final=True), final=True):
+        yield item
+
+
+class _ArrayScanner:
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._state: Literal["start", "first", "value", "separator", "end"] = "start"
+
+    def feed(self, text: str, *, final: bool) -> list[Any]:
+        buffer = self._buffer + text
+        position = 0
+        items: list[Any] = []
+        while (position := _skip_whitespace(buffer, position)) < len(buffer):
+            if self._state == "start":
+                if buffer[position] != "[":
+                    raise TypeError("JSON document must be an array")
+                self._state = "first"
+                position += 1
+            elif self._state == "first" and buffer[position] == "]":
+                self._state = "end"
+                position += 1
+            elif self._state in ("first", "value"):
+                try:
+                    item, end = _DECODER.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                scalar = buffer[position] not in '{["'
+                if scalar and not final and (end == len(buffer) or buffer[end] not in _SCALAR_ENDINGS):
+                    break
+                items.append(item)
+                self._state = "separator"
+                position = end
+            elif self._state == "separator" and buffer[position] in ",]":
+                self._state = "value" if buffer[position] == "," else "end"
+                position += 1
+            else:
+                raise json.JSONDecodeError("Unexpected data in JSON array", buffer, position)
+        self._buffer = buffer[position:]
+        if final and self._state != "end":
+            raise json.JSONDecodeError("Unterminated JSON array", buffer, len(buffer))
+        return items
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    while position < len(text) and text[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+@dataclass(frozen=True, slots=True)
+class RawJson:
+    text: str
+
+
+def write_json(path: Path, value: Any, *, indent: int = 2) -> None:
+    with path.open("w", encoding="utf-8") as file:
+        for chunk in iter_json(value, indent=indent):
+            file.write(chunk)
+
+
+def iter_json(value: Any, *, indent: int = 2, level: int = 0) -> Iterator[str]:
+    if isinstance(value, RawJson):
+        yield value.text.replace("\n", "\n" + " " * indent * level)
+        return
+    if isinstance(value, dict | list | tuple):
+        try:
+            encoded = json.dumps(value, ensure_ascii=False, indent=indent)
+        except TypeError:
+            pass
+        else:
+            yield encoded.replace("\n", "\n" + " " * indent * level)
+            return
+    if isinstance(value, Mapping):
+        separator = "{"
+        for key, item in value.items():
+            yield f"{separator}\n{' ' * indent * (level + 1)}{json.dumps(str(key), ensure_ascii=False)}: "
+            yield from iter_json(item, indent=indent, level=level + 1)
+            separator = ","
+        yield "{}" if separator == "{" else f"\n{' ' * indent * level}}}"
+    elif isinstance(value, Iterable) and not isinstance(value, str | bytes):
+        separator = "["
+        for item in value:
+            yield f"{separator}\n{' ' * indent * (level + 1)}"
+            yield from iter_json(item, indent=indent, level=level + 1)
+            separator = ","
+        yield "[]" if separator == "[" else f"\n{' ' * indent * level}]"
+    else:
+        yield json.dumps(value, ensure_ascii=False)
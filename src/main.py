@@ -1,26 +1,53 @@
 import asyncio
 import os
 from datetime import date, datetime, timezone
+from pathlib import Path
 
 from commit_feed import CommitFeed
 from config import Config
 from dotenv import load_dotenv
-from github_client import GitHubClient
+from github_client import ETagCache, GitHubClient
 from log import configure_logging
 from pipeline import run_daily
-from summarizer import build_summarizer
+from state_store import StateStore
+from summarizer import CachedSummarizer, build_summarizer
 
 
 async def run(config: Config) -> None:
     now = datetime.now(timezone.utc)
-    async with GitHubClient(config.github_token) as transport:
-        await run_daily(
-            config,
-            transport=transport,
-            commit_feed=CommitFeed(transport, now=lambda: now),
-            summarizer=build_summarizer(config.summarizer_model),
-            published_at=now,
-        )
+    state_store = StateStore(config.state_db) if config.state_db else None
+    summarizer = build_summarizer(
+        config.summarizer_model,
+        batch_size=config.summary_batch_size,
+        cache_file=Path("summaries.json"),
+        now=lambda: now,
+    )
+    try:
+        async with GitHubClient(
+            config.github_token,
+            etag_cache=ETagCache(Path("etags.json")),
+            rate_limit_wait=config.rate_limit_wait,
+        ) as transport:
+            await run_daily(
+                config,
+                transport=transport,
+                commit_feed=CommitFeed(
+                    transport,
+                    now=lambda: now,
+                    backend=config.commit_backend,
+                    probe=config.commit_probe,
+                    fetch_limit=config.commit_fetch_limit,
+                    state_store=state_store,
+                ),
+                summarizer=summarizer,
+                published_at=now,
+                state_store=state_store,
+            )
+    finally:
+        if isinstance(summarizer, CachedSummarizer):
+            summarizer.save()
+        if state_store is not None:
+            state_store.close()
 
 
 def main() -> None:
@@ -1,31 +1,67 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import tempfile
 import time
-from collections.abc import Mapping
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Coroutine, Iterable, Iterator, Sequence
+from contextlib import aclosing
+from dataclasses import dataclass, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
-from commit_feed import CommitFeed, RateLimitError
+from checkpoint import RunCheckpoint
+from commit_feed import CommitFeed, FetchedCommits, RateLimitError
 from config import Config
 from github_client import GitHubClient
 from log import logger
-from report import ReportRow, assemble_report, merge_reports, render_json_feed, render_markdown
+from records import Commit, Repo
+from report import ReportRow, report_entry
+from report_segments import ReportSegments
 from selection import advance_empty_streak, select_repos
+from state_store import StateStore
 from summarizer import Summarizer
 
 
+_FetchedRow = tuple[int, Repo, list[Commit], int]
+
+
 @dataclass(frozen=True, slots=True)
 class RunArtifacts:
-    report: dict[str, Any]
-    markdown: str
-    feed: dict[str, Any]
     report_path: Path
     markdown_path: Path
     feed_path: Path
 
+    def load_report(self) -> dict[str, Any]:
+        return json.loads(self.report_path.read_text(encoding="utf-8"))
+
+    def load_markdown(self) -> str:
+        return self.markdown_path.read_text(encoding="utf-8")
+
+    def load_feed(self) -> dict[str, Any]:
+        return json.loads(self.feed_path.read_text(encoding="utf-8"))
+
+
+class _ReportSpool:
+    def __init__(self, file: TextIO) -> None:
+        self._file = file
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._next_index = 0
+
+    def add(self, index: int, entry: dict[str, Any]) -> None:
+        self._pending[index] = entry
+        while (ready := self._pending.pop(self._next_index, None)) is not None:
+            self._file.write(json.dumps(ready, ensure_ascii=False) + "\n")
+            self._next_index += 1
+
+    def entries(self) -> Iterator[dict[str, Any]]:
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield json.loads(line)
+
 
 async def run_daily(
     config: Config,
@@ -35,62 +71,88 @@ async def run_daily(
     summarizer: Summarizer,
     report_dir: Path = Path("reports"),
     published_at: datetime,
+    state_store: StateStore | None = None,
 ) -> RunArtifacts:
     report_path = report_dir / f"recent_commits_{config.report_date.isoformat()}.json"
     markdown_path = report_dir / f"recent_commits_{config.report_date.isoformat()}.md"
     feed_path = report_dir / "feed.json"
-    existing_report = _load_report(report_path)
-    excluded_names = {str(repo["name"]) for repo in existing_report["repos"]} if existing_report else set()
+    segments = ReportSegments(report_path)
+    store_names = state_store.report_names(config.report_date) if state_store is not None else set()
+    if state_store is not None and store_names and not segments.names:
+        segments.append(state_store.iter_report_repos(config.report_date), published_at=published_at)
+    elif not segments.names and (existing_report := _load_report(report_path)) is not None:
+        segments.append(existing_report["repos"], published_at=published_at)
+    if state_store is not None and segments.names and not store_names:
+        state_store.append_report(config.report_date, {"repos": segments.iter_repos()})
+    excluded_names = store_names | segments.names
 
-    selected_repos: list[Mapping[str, Any]] = []
-    if config.repo_limit > 0:
-        async for page in transport.starred_repo_pages():
-            remaining = config.repo_limit - len(selected_repos)
-            selected_repos.extend(
-                select_repos(
-                    page,
-                    excluded_names=excluded_names,
-                    limit=remaining,
-                    is_active=commit_feed.is_active_repo,
-                )
+    checkpoint = RunCheckpoint(report_dir / f"checkpoint_{config.report_date.isoformat()}.jsonl")
+    selected_repos: list[Repo] = []
+    written: list[FetchedCommits] = []
+    if checkpoint.selected_repos is not None:
+        written.extend(fetched for name, fetched in checkpoint.fetched.items() if name in excluded_names)
+        selected_repos.extend(repo for repo in checkpoint.selected_repos if repo.full_name not in excluded_names)
+        logger.info(
+            "Resuming from checkpoint: %s selected, %s fetched, %s summarized",
+            len(selected_repos),
+            len(checkpoint.fetched),
+            len(checkpoint.summaries),
+        )
+    else:
+        if config.repo_limit > 0:
+            await _select_starred(
+                selected_repos,
+                config=config,
+                transport=transport,
+                commit_feed=commit_feed,
+                excluded_names=excluded_names,
             )
-            if len(selected_repos) == config.repo_limit:
-                break
+        checkpoint.start(selected_repos)
 
-    rows: list[ReportRow] = []
-    empty_streak = 0
-    for repo in selected_repos:
-        try:
-            commits = await commit_feed.new_commits(repo)
-        except RateLimitError as error:
-            logger.error("%s; stopping this run", error)
-            break
-
-        summary = await summarizer.summarize(repo, commits)
-        rows.append((repo, commits, summary))
-        streak = advance_empty_streak(
-            current=empty_streak,
-            has_commits=bool(commits),
-            limit=config.empty_streak_limit,
-        )
-        empty_streak = streak.count
-        if streak.should_stop:
+    await commit_feed.prepare([repo for repo in selected_repos if repo.full_name not in checkpoint.fetched])
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool_file:
+        spool = _ReportSpool(spool_file)
+        workers = max(config.summarize_concurrency, 1)
+        batch_size = max(config.summary_batch_size, 1)
+        queue: asyncio.Queue[_FetchedRow | None] = asyncio.Queue(maxsize=workers * batch_size)
+        async with asyncio.TaskGroup() as task_group:
+            for _ in range(workers):
+                task_group.create_task(
+                    _summarize_queued(
+                        queue,
+                        summarizer=summarizer,
+                        checkpoint=checkpoint,
+                        spool=spool,
+                        batch_size=batch_size,
+                    )
+                )
+            await _fetch_into(
+                queue,
+                config=config,
+                commit_feed=commit_feed,
+                checkpoint=checkpoint,
+                repos=selected_repos,
+                written=written,
+            )
+            await queue.put(None)
+        if commit_feed.fetches_skipped:
+            logger.info(
+                "Commit probes skipped %s commit fetches for unchanged repositories", commit_feed.fetches_skipped
+            )
+        if commit_feed.requests_avoided:
             logger.info(
-                "Stopping after %s consecutive repositories without commits",
-                empty_streak,
+                "Skipped %s commit requests for repos not pushed since they were last checked",
+                commit_feed.requests_avoided,
             )
-            break
-
-    report = assemble_report(rows)
-    if existing_report is not None:
-        report = merge_reports(existing_report, report)
-    markdown = render_markdown(report)
-    feed = render_json_feed(report, published_at=published_at)
-
-    report_dir.mkdir(parents=True, exist_ok=True)
-    report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
-    markdown_path.write_text(markdown, encoding="utf-8")
-    feed_path.write_text(json.dumps(feed, ensure_ascii=False, indent=2), encoding="utf-8")
+
+        if state_store is not None:
+            state_store.append_report(config.report_date, {"repos": spool.entries()})
+        segments.append(spool.entries(), published_at=published_at)
+    await commit_feed.advance_all(written)
+    segments.write_report(report_path)
+    segments.write_markdown(markdown_path)
+    segments.write_feed(feed_path)
+    checkpoint.clear()
     _write_ci_outputs(
         config,
         report_path=report_path,
@@ -99,20 +161,147 @@ async def run_daily(
     )
     _cleanup_old_reports(
         report_dir,
-        excluded={report_path, markdown_path},
+        excluded={report_path, markdown_path, segments.segments_path, segments.state_path},
         dry_run=not config.is_ci,
     )
 
     return RunArtifacts(
-        report=report,
-        markdown=markdown,
-        feed=feed,
         report_path=report_path,
         markdown_path=markdown_path,
         feed_path=feed_path,
     )
 
 
+async def _select_starred(
+    selected_repos: list[Repo],
+    *,
+    config: Config,
+    transport: GitHubClient,
+    commit_feed: CommitFeed,
+    excluded_names: set[str],
+) -> None:
+    pages_read = 0
+    stale_pages = 0
+    concurrency = min(config.starred_page_concurrency, config.starred_page_tolerance + 1)
+    async with aclosing(transport.starred_repo_pages(concurrency=concurrency)) as pages:
+        async for page in pages:
+            pages_read += 1
+            repos = [Repo.from_github(item) for item in page]
+            selected_repos.extend(
+                select_repos(
+                    repos,
+                    excluded_names=excluded_names,
+                    limit=config.repo_limit - len(selected_repos),
+                    is_active=commit_feed.is_active_repo,
+                )
+            )
+            if len(selected_repos) == config.repo_limit:
+                return
+            stale_pages = 0 if any(commit_feed.is_active_repo(repo) for repo in repos) else stale_pages + 1
+            if stale_pages > config.starred_page_tolerance:
+                page_count = transport.starred_page_count
+                logger.info(
+                    "Stopping starred listing after %s pages without recently pushed repositories; %s pages skipped",
+                    stale_pages,
+                    page_count - pages_read if page_count is not None else "remaining",
+                )
+                return
+
+
+async def _fetch_into(
+    queue: asyncio.Queue[_FetchedRow | None],
+    *,
+    config: Config,
+    commit_feed: CommitFeed,
+    checkpoint: RunCheckpoint,
+    repos: Sequence[Repo],
+    written: list[FetchedCommits],
+) -> None:
+    async def fetch(repo: Repo, stop: asyncio.Event) -> FetchedCommits:
+        if (fetched := checkpoint.fetched.get(repo.full_name)) is not None:
+            return fetched
+        return await commit_feed.fetch(repo, stop=stop)
+
+    empty_streak = 0
+    try:
+        async with aclosing(_fetch_in_order(fetch, repos, concurrency=config.fetch_concurrency)) as fetched_repos:
+            index = 0
+            async for repo, fetched in fetched_repos:
+                checkpoint.record_fetch(fetched)
+                written.append(replace(fetched, commits=[]))
+                await queue.put((index, repo, fetched.commits, fetched.commit_count))
+                index += 1
+                streak = advance_empty_streak(
+                    current=empty_streak,
+                    has_commits=bool(fetched.commits),
+                    limit=config.empty_streak_limit,
+                )
+                empty_streak = streak.count
+                if streak.should_stop:
+                    logger.info(
+                        "Stopping after %s consecutive repositories without commits",
+                        empty_streak,
+                    )
+                    break
+    except RateLimitError as error:
+        logger.error("%s; stopping this run", error)
+
+
+async def _summarize_queued(
+    queue: asyncio.Queue[_FetchedRow | None],
+    *,
+    summarizer: Summarizer,
+    checkpoint: RunCheckpoint,
+    spool: _ReportSpool,
+    batch_size: int,
+) -> None:
+    finished = False
+    while not finished:
+        batch: list[_FetchedRow] = []
+        while not batch or (len(batch) < batch_size and not queue.empty()):
+            item = queue.get_nowait() if batch else await queue.get()
+            if item is None:
+                finished = True
+                break
+            batch.append(item)
+        pending = [(repo, commits) for _, repo, commits, _ in batch if repo.full_name not in checkpoint.summaries]
+        summaries = await summarizer.summarize_many(pending) if pending else []
+        for (repo, _), summary in zip(pending, summaries, strict=True):
+            checkpoint.record_summary(repo.full_name, summary)
+        for index, repo, commits, commit_count in batch:
+            row = ReportRow(
+                repo=repo,
+                commits=commits,
+                summary=checkpoint.summaries[repo.full_name],
+                commit_count=commit_count,
+            )
+            spool.add(index, report_entry(row))
+            checkpoint.release(repo.full_name)
+    queue.put_nowait(None)
+
+
+async def _fetch_in_order(
+    fetch: Callable[[Repo, asyncio.Event], Coroutine[Any, Any, FetchedCommits]],
+    repos: Iterable[Repo],
+    *,
+    concurrency: int,
+) -> AsyncGenerator[tuple[Repo, FetchedCommits]]:
+    pending: deque[tuple[Repo, asyncio.Task[FetchedCommits]]] = deque()
+    remaining = iter(repos)
+    stop = asyncio.Event()
+    try:
+        while True:
+            while len(pending) < max(concurrency, 1) and (repo := next(remaining, None)) is not None:
+                pending.append((repo, asyncio.create_task(fetch(repo, stop))))
+            if not pending:
+                return
+            repo, task = pending.popleft()
+            yield repo, await task
+    finally:
+        stop.set()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+
 def _load_report(path: Path) -> dict[str, Any] | None:
     if not path.exists():
         return None
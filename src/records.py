@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+
+@dataclass(frozen=True, slots=True)
+class Repo:
+    full_name: str
+    html_url: str
+    description: str | None = None
+    topics: tuple[str, ...] = ()
+    pushed_at: datetime | None = None
+    default_branch: str | None = None
+    fork: bool = False
+
+    @classmethod
+    def from_github(cls, data: Mapping[str, Any]) -> Repo:
+        full_name = str(data["full_name"])
+        pushed_at = data.get("pushed_at")
+        return cls(
+            full_name=full_name,
+            html_url=str(data.get("html_url") or f"https://github.com/{full_name}"),
+            description=data.get("description"),
+            topics=tuple(data.get("topics") or ()),
+            pushed_at=parse_datetime(str(pushed_at)) if pushed_at else None,
+            default_branch=data.get("default_branch"),
+            fork=bool(data.get("fork")),
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "full_name": self.full_name,
+            "html_url": self.html_url,
+            "description": self.description,
+            "topics": list(self.topics),
+            "pushed_at": self.pushed_at.isoformat() if self.pushed_at is not None else None,
+            "default_branch": self.default_branch,
+            "fork": self.fork,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Commit:
+    sha: str
+    message: str
+    authored_date: str
+    committed_at: datetime
+    author_login: str | None
+    author_type: str | None = None
+
+    @classmethod
+    def from_github(cls, data: Mapping[str, Any]) -> Commit:
+        details = data["commit"]
+        author = data.get("author")
+        if not isinstance(author, Mapping):
+            author = {}
+        return cls(
+            sha=str(data["sha"]),
+            message=str(details["message"]),
+            authored_date=str(details["author"]["date"]),
+            committed_at=parse_datetime(str(details["committer"]["date"])),
+            author_login=author.get("login"),
+            author_type=author.get("type"),
+        )
+
+    @property
+    def is_bot(self) -> bool:
+        return self.author_login is None or self.author_type == "Bot" or "[bot]" in self.author_login
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "sha": self.sha,
+            "author": {"login": self.author_login, "type": self.author_type} if self.author_login is not None else None,
+            "commit": {
+                "message": self.message,
+                "author": {"date": self.authored_date},
+                "committer": {"date": self.committed_at.isoformat()},
+            },
+        }
+
+
+def parse_datetime(value: str) -> datetime:
+    return as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        raise ValueError("Timestamp must include a timezone")
+    return value.astimezone(timezone.utc)
@@ -1,69 +1,75 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Mapping, Sequence
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 from typing import Any
 
+from records import Commit, Repo
+
 JsonDict = dict[str, Any]
-ReportRow = tuple[Mapping[str, Any], Sequence[Mapping[str, Any]], str | None]
 
 
-def assemble_report(rows: Iterable[ReportRow]) -> JsonDict:
-    materialized_rows = list(rows)
-    repos: list[JsonDict] = []
-    total_commits = 0
-    active_repos = 0
-
-    for repo, commits, summary in materialized_rows:
-        commit_count = len(commits)
-        total_commits += commit_count
-        active_repos += int(commit_count > 0)
-        item: JsonDict = {
-            "name": repo["full_name"],
-            "url": repo["html_url"],
-            "commit_count": commit_count,
-            "summary": summary,
-            "description": repo.get("description"),
-            "commits": [
-                {
-                    "sha": commit["sha"],
-                    "message": commit["commit"]["message"],
-                    "date": commit["commit"]["author"]["date"],
-                }
-                for commit in commits
-            ],
-        }
-        if topics := repo.get("topics"):
-            item["topics"] = topics
-        repos.append(item)
+@dataclass(frozen=True, slots=True)
+class ReportRow:
+    repo: Repo
+    commits: Sequence[Commit]
+    summary: str | None
+    commit_count: int
+
 
+def assemble_report(rows: Iterable[ReportRow]) -> JsonDict:
+    repos = [report_entry(row) for row in rows]
     return {
-        "total_repos_count": len(materialized_rows),
-        "active_repos_count": active_repos,
-        "total_commits_count": total_commits,
+        "total_repos_count": len(repos),
+        "active_repos_count": sum(repo["commit_count"] > 0 for repo in repos),
+        "total_commits_count": sum(repo["commit_count"] for repo in repos),
         "repos": repos,
     }
 
 
-def merge_reports(left: Mapping[str, Any], right: Mapping[str, Any]) -> JsonDict:
-    return {
-        "total_repos_count": left["total_repos_count"] + right["total_repos_count"],
-        "active_repos_count": left["active_repos_count"] + right["active_repos_count"],
-        "total_commits_count": left["total_commits_count"] + right["total_commits_count"],
-        "repos": [*left["repos"], *right["repos"]],
+def report_entry(row: ReportRow) -> JsonDict:
+    repo = row.repo
+    item: JsonDict = {
+        "name": repo.full_name,
+        "url": repo.html_url,
+        "commit_count": row.commit_count,
+        "summary": row.summary,
+        "description": repo.description,
+        "commits": [
+            {
+                "sha": commit.sha,
+                "message": commit.message,
+                "date": commit.authored_date,
+            }
+            for commit in row.commits
+        ],
     }
+    if repo.topics:
+        item["topics"] = list(repo.topics)
+    return item
 
 
 def render_json_feed(report: Mapping[str, Any], *, published_at: datetime) -> JsonDict:
-    feed: JsonDict = {
+    return json_feed(list(iter_json_feed_items(report.get("repos", []), published_at=published_at)))
+
+
+def json_feed(items: Iterable[Any]) -> JsonDict:
+    return {
         "version": "https://jsonfeed.org/version/1.1",
         "title": "GitHub Starred Repositories Activity",
         "home_page_url": "https://github.com/RoCry/git-stargazer/releases/latest",
         "feed_url": "https://github.com/RoCry/git-stargazer/releases/download/latest/feed.json",
-        "items": [],
+        "items": items,
     }
 
-    for repo in report.get("repos", []):
+
+def iter_json_feed_items(repos: Iterable[Mapping[str, Any]], *, published_at: datetime) -> Iterator[JsonDict]:
+    for repo in repos:
         if repo.get("commit_count", 0) == 0:
             continue
 
@@ -104,64 +110,56 @@ def render_json_feed(report: Mapping[str, Any], *, published_at: datetime) -> Js
                 "</div>",
             ]
         )
-        feed["items"].append(
-            {
-                "id": repo["url"],
-                "url": repo["url"],
-                "title": title,
-                "content_text": "\n".join(content_lines),
-                "content_html": "\n".join(content_html_lines),
-                "date_published": published_at.isoformat(),
-                "tags": repo.get("topics", []),
-            }
-        )
-
-    return feed
+        yield {
+            "id": repo["url"],
+            "url": repo["url"],
+            "title": title,
+            "content_text": "\n".join(content_lines),
+            "content_html": "\n".join(content_html_lines),
+            "date_published": published_at.isoformat(),
+            "tags": repo.get("topics", []),
+        }
 
 
 def render_markdown(report: Mapping[str, Any]) -> str:
-    if not report["repos"]:
-        return "# Recent Activity in Starred Repositories\nNo recent activity found in starred repositories."
-
-    active_repos = [repo for repo in report["repos"] if repo["commit_count"] > 0]
-    topic_frequency: dict[str, int] = {}
-    for repo in active_repos:
-        for topic in _topics(repo):
-            topic_frequency[topic] = topic_frequency.get(topic, 0) + 1
-
-    groups: dict[str, list[Mapping[str, Any]]] = {"Other": []}
-    processed: set[str] = set()
-    for index, repo in enumerate(active_repos):
-        if repo["name"] in processed:
-            continue
-        shared_topics = set(_topics(repo))
-        if not shared_topics:
-            groups["Other"].append(repo)
-            processed.add(repo["name"])
-            continue
+    return "".join(iter_markdown(report))
 
-        similar = [repo]
-        for other in active_repos[index + 1 :]:
-            other_topics = set(_topics(other))
-            if other["name"] not in processed and shared_topics & other_topics:
-                similar.append(other)
-                shared_topics &= other_topics
-                processed.add(other["name"])
-
-        group_name = (
-            ", ".join(
-                sorted(
-                    shared_topics,
-                    key=lambda topic: (-topic_frequency[topic], topic),
-                )
-            )
-            if len(similar) > 1 and shared_topics
-            else "Other"
-        )
-        groups.setdefault(group_name, []).extend(similar)
-        processed.add(repo["name"])
 
-    sections: list[str] = []
+def iter_markdown(report: Mapping[str, Any]) -> Iterator[str]:
+    total_repos = 0
+    active_repos: list[JsonDict] = []
+    for repo in report["repos"]:
+        total_repos += 1
+        if repo["commit_count"] > 0:
+            active_repos.append(markdown_fields(repo))
+    topic_groups = TopicGroups()
+    topic_groups.add(active_repos)
+    yield from iter_markdown_sections(
+        topic_groups,
+        total_repos_count=total_repos,
+        active_repos_count=report["active_repos_count"],
+        total_commits_count=report["total_commits_count"],
+    )
+
+
+def iter_markdown_sections(
+    topic_groups: TopicGroups,
+    *,
+    total_repos_count: int,
+    active_repos_count: int,
+    total_commits_count: int,
+) -> Iterator[str]:
+    if not total_repos_count:
+        yield "# Recent Activity in Starred Repositories\nNo recent activity found in starred repositories."
+        return
+
+    groups = topic_groups.groups()
+    yield (
+        "# Recent Activity in Starred Repositories\n"
+        f"_{active_repos_count} active repos with "
+        f"{total_commits_count} new commits_\n"
+    )
+    separator = ""
     for group_name in [*sorted(name for name in groups if name != "Other"), "Other"]:
         header = (
             "\n## Other"
@@ -169,24 +167,105 @@ def render_markdown(report: Mapping[str, Any]) -> str:
             else "\n## "
             + ", ".join(f"[{topic}](https://github.com/topics/{topic})" for topic in group_name.split(", "))
         )
-        sections.append(header)
+        yield separator + header
+        separator = "\n"
         for repo in sorted(
             groups[group_name],
             key=lambda item: (-item["commit_count"], item["name"].lower()),
         ):
-            message = repo.get("summary")
-            if not message and repo.get("commits"):
-                message = repo["commits"][0].get("message")
-            if message:
-                sections.append(
-                    f"- [{repo['name']}]({repo['url']}) [{repo['commit_count']}]({repo['url']}/commits): {message}"
+            if message := repo["message"]:
+                yield f"\n- [{repo['name']}]({repo['url']}) [{repo['commit_count']}]({repo['url']}/commits): {message}"
+
+
+def markdown_fields(repo: Mapping[str, Any]) -> JsonDict:
+    message = repo.get("summary")
+    if not message and repo.get("commits"):
+        message = repo["commits"][0].get("message")
+    return {
+        "name": repo["name"],
+        "url": repo["url"],
+        "commit_count": repo["commit_count"],
+        "topics": repo.get("topics", []),
+        "message": message,
+    }
+
+
+class TopicGroups:
+    def __init__(self) -> None:
+        self._topic_frequency: Counter[str] = Counter()
+        self._seeds: list[tuple[set[str], list[JsonDict]]] = []
+        self._other: list[JsonDict] = []
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> TopicGroups:
+        topic_groups = cls()
+        topic_groups._topic_frequency.update(data["topic_frequency"])
+        topic_groups._seeds = [(set(group["topics"]), list(group["repos"])) for group in data["groups"]]
+        topic_groups._other = list(data["other"])
+        return topic_groups
+
+    def to_json(self) -> JsonDict:
+        return {
+            "topic_frequency": dict(self._topic_frequency),
+            "groups": [{"topics": sorted(topics), "repos": repos} for topics, repos in self._seeds],
+            "other": self._other,
+        }
+
+    def add(self, active_repos: Sequence[Mapping[str, Any]]) -> None:
+        topic_lists = [_topics(repo) for repo in active_repos]
+        topic_sets = [frozenset(topics) for topics in topic_lists]
+        self._topic_frequency.update(topic for topics in topic_lists for topic in topics)
+        repos_by_topic: dict[str, list[int]] = {}
+        for index, topics in enumerate(topic_sets):
+            for topic in topics:
+                repos_by_topic.setdefault(topic, []).append(index)
+        members = [{key: value for key, value in repo.items() if key != "topics"} for repo in active_repos]
+
+        processed: set[str] = set()
+
+        def absorb(shared_topics: set[str], similar: list[JsonDict], start: int) -> None:
+            candidates = heapq.merge(
+                *(
+                    islice(repos_by_topic[topic], bisect_left(repos_by_topic[topic], start), None)
+                    for topic in shared_topics
+                    if topic in repos_by_topic
                 )
+            )
+            previous = -1
+            for other_index in candidates:
+                if other_index == previous:
+                    continue
+                previous = other_index
+                other = members[other_index]
+                if other["name"] not in processed and shared_topics & topic_sets[other_index]:
+                    similar.append(other)
+                    shared_topics &= topic_sets[other_index]
+                    processed.add(other["name"])
 
-    return (
-        "# Recent Activity in Starred Repositories\n"
-        f"_{report['active_repos_count']} active repos with "
-        f"{report['total_commits_count']} new commits_\n" + "\n".join(sections)
-    )
+        for shared_topics, similar in self._seeds:
+            absorb(shared_topics, similar, 0)
+        for index, repo in enumerate(members):
+            if repo["name"] in processed:
+                continue
+            if not topic_sets[index]:
+                self._other.append(repo)
+                processed.add(repo["name"])
+                continue
+            seed = (set(topic_sets[index]), [repo])
+            absorb(*seed, index + 1)
+            self._seeds.append(seed)
+            processed.add(repo["name"])
+
+    def groups(self) -> dict[str, list[JsonDict]]:
+        groups: dict[str, list[JsonDict]] = {"Other": list(self._other)}
+        for shared_topics, similar in self._seeds:
+            group_name = (
+                ", ".join(sorted(shared_topics, key=lambda topic: (-self._topic_frequency[topic], topic)))
+                if len(similar) > 1
+                else "Other"
+            )
+            groups.setdefault(group_name, []).extend(similar)
+        return groups
 
 
 def _topics(repo: Mapping[str, Any]) -> list[str]:
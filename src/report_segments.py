@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from json_stream import RawJson, iter_json, write_json
+from report import JsonDict, TopicGroups, iter_json_feed_items, iter_markdown_sections, json_feed, markdown_fields
+
+
+class ReportSegments:
+    def __init__(self, report_path: Path) -> None:
+        self.segments_path = report_path.with_suffix(".segments.jsonl")
+        self.state_path = report_path.with_suffix(".state.json")
+        self.names: set[str] = set()
+        self.totals = (0, 0, 0)
+        self._size = 0
+        self._topic_groups = TopicGroups()
+        self._load()
+
+    def append(self, repos: Iterable[Mapping[str, Any]], *, published_at: datetime) -> None:
+        total_repos, active_repos, total_commits = self.totals
+        new_active_repos: list[JsonDict] = []
+        self.segments_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.segments_path.open("ab") as segments:
+            segments.truncate(self._size)
+            for repo in repos:
+                feed_item = next(iter_json_feed_items([repo], published_at=published_at), None)
+                record = {
+                    "name": repo["name"],
+                    "report": "".join(iter_json(repo)),
+                    "feed": "".join(iter_json(feed_item)) if feed_item is not None else None,
+                }
+                segments.write((json.dumps(record, ensure_ascii=False) + "\n").encode())
+                self.names.add(repo["name"])
+                total_repos += 1
+                total_commits += repo["commit_count"]
+                if repo["commit_count"] > 0:
+                    active_repos += 1
+                    new_active_repos.append(markdown_fields(repo))
+            self._size = segments.tell()
+        self.totals = (total_repos, active_repos, total_commits)
+        self._topic_groups.add(new_active_repos)
+        self._save()
+
+    def write_report(self, path: Path) -> None:
+        total_repos, active_repos, total_commits = self.totals
+        write_json(
+            path,
+            {
+                "total_repos_count": total_repos,
+                "active_repos_count": active_repos,
+                "total_commits_count": total_commits,
+                "repos": (RawJson(record["report"]) for record in self._records()),
+            },
+        )
+
+    def write_markdown(self, path: Path) -> None:
+        total_repos, active_repos, total_commits = self.totals
+        with path.open("w", encoding="utf-8") as markdown:
+            markdown.writelines(
+                iter_markdown_sections(
+                    self._topic_groups,
+                    total_repos_count=total_repos,
+                    active_repos_count=active_repos,
+                    total_commits_count=total_commits,
+                )
+            )
+
+    def write_feed(self, path: Path) -> None:
+        write_json(path, json_feed(RawJson(record["feed"]) for record in self._records() if record["feed"] is not None))
+
+    def iter_repos(self) -> Iterator[dict[str, Any]]:
+        for record in self._records():
+            yield json.loads(record["report"])
+
+    def _records(self) -> Iterator[dict[str, Any]]:
+        if not self._size:
+            return
+        remaining = self._size
+        with self.segments_path.open("rb") as segments:
+            for line in segments:
+                if remaining <= 0:
+                    return
+                remaining -= len(line)
+                yield json.loads(line)
+
+    def _load(self) -> None:
+        if not self.state_path.exists():
+            return
+        data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict) or data.get("version") != 1 or not isinstance(data.get("topic_groups"), dict):
+            raise ValueError(f"Unsupported report state format: {self.state_path}")
+        if not self.segments_path.exists() or self.segments_path.stat().st_size < data["size"]:
+            raise ValueError(f"Report segments are shorter than recorded: {self.segments_path}")
+        self.names = set(data["names"])
+        total_repos, active_repos, total_commits = data["totals"]
+        self.totals = (total_repos, active_repos, total_commits)
+        self._size = data["size"]
+        self._topic_groups = TopicGroups.from_json(data["topic_groups"])
+
+    def _save(self) -> None:
+        total_repos, active_repos, total_commits = self.totals
+        data = {
+            "version": 1,
+            "size": self._size,
+            "totals": [total_repos, active_repos, total_commits],
+            "names": sorted(self.names),
+            "topic_groups": self._topic_groups.to_json(),
+        }
+        temporary_file = self.state_path.with_suffix(f"{self.state_path.suffix}.tmp")
+        temporary_file.write_text(json.dumps(data, ensure_ascii=False) + "\n", encoding="utf-8")
+        temporary_file.replace(self.state_path)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Iterable, Mapping
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
-from typing import Any
+
+from records import Repo
 
 
 @dataclass(frozen=True, slots=True)
@@ -12,18 +13,18 @@ class EmptyStreakDecision:
 
 
 def select_repos(
-    repos: Iterable[Mapping[str, Any]],
+    repos: Iterable[Repo],
     *,
     excluded_names: set[str],
     limit: int,
-    is_active: Callable[[Mapping[str, Any]], bool],
-) -> list[Mapping[str, Any]]:
+    is_active: Callable[[Repo], bool],
+) -> list[Repo]:
     if limit <= 0:
         return []
 
-    selected: list[Mapping[str, Any]] = []
+    selected: list[Repo] = []
     for repo in repos:
-        if str(repo["full_name"]) in excluded_names or not is_active(repo):
+        if repo.full_name in excluded_names or not is_active(repo):
             continue
         selected.append(repo)
         if len(selected) == limit:
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator, Mapping
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    repo TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS heads (
+    repo TEXT PRIMARY KEY,
+    sha TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checks (
+    repo TEXT PRIMARY KEY,
+    checked_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_repos (
+    report_date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    commit_count INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (report_date, position)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS report_repos_by_name ON report_repos (report_date, name);
+CREATE TABLE IF NOT EXISTS report_commits (
+    report_date TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    sha TEXT NOT NULL,
+    message TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (report_date, repo, position)
+);
+"""
+
+
+class StateStore:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def watermarks(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT repo, watermark FROM watermarks"))
+
+    def heads(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT repo, sha FROM heads"))
+
+    def checked(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT repo, checked_at FROM checks"))
+
+    def save_watermark(
+        self, repo_name: str, watermark: str, *, head: str | None = None, checked_at: str | None = None
+    ) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO watermarks (repo, watermark) VALUES (?, ?) "
+                "ON CONFLICT (repo) DO UPDATE SET watermark = excluded.watermark",
+                (repo_name, watermark),
+            )
+            if head is not None:
+                self._connection.execute(
+                    "INSERT INTO heads (repo, sha) VALUES (?, ?) ON CONFLICT (repo) DO UPDATE SET sha = excluded.sha",
+                    (repo_name, head),
+                )
+            if checked_at is not None:
+                self._connection.execute(
+                    "INSERT INTO checks (repo, checked_at) VALUES (?, ?) "
+                    "ON CONFLICT (repo) DO UPDATE SET checked_at = excluded.checked_at",
+                    (repo_name, checked_at),
+                )
+
+    def report_names(self, report_date: date) -> set[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name FROM report_repos WHERE report_date = ?", (report_date.isoformat(),)
+            )
+            return {name for (name,) in rows}
+
+    def append_report(self, report_date: date, report: Mapping[str, Any]) -> None:
+        day = report_date.isoformat()
+        with self._lock, self._connection:
+            (offset,) = self._connection.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM report_repos WHERE report_date = ?", (day,)
+            ).fetchone()
+            for position, repo in enumerate(report["repos"], start=offset):
+                self._connection.execute(
+                    "INSERT INTO report_repos (report_date, position, name, commit_count, entry) VALUES (?, ?, ?, ?, ?)",
+                    (day, position, repo["name"], repo["commit_count"], json.dumps({**repo, "commits": []})),
+                )
+                self._connection.executemany(
+                    "INSERT INTO report_commits (report_date, repo, position, sha, message, date) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (day, repo["name"], index, commit["sha"], commit["message"], commit["date"])
+                        for index, commit in enumerate(repo["commits"])
+                    ],
+                )
+
+    def iter_report_repos(self, report_date: date) -> Iterator[dict[str, Any]]:
+        day = report_date.isoformat()
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT name, entry FROM report_repos WHERE report_date = ? ORDER BY position", (day,)
+            ).fetchall()
+        for name, entry in entries:
+            repo = json.loads(entry)
+            with self._lock:
+                repo["commits"] = [
+                    {"sha": sha, "message": message, "date": committed_at}
+                    for sha, message, committed_at in self._connection.execute(
+                        "SELECT sha, message, date FROM report_commits "
+                        "WHERE report_date = ? AND repo = ? ORDER BY position",
+                        (day, name),
+                    )
+                ]
+            yield repo
@@ -1,40 +1,56 @@
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+import asyncio
+import hashlib
+import json
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any, Protocol
 
+from log import logger
+from records import Commit, Repo
+
+SummaryRequest = tuple[Repo, Sequence[Commit]]
+
 
 class Summarizer(Protocol):
     async def summarize(
         self,
-        repo: Mapping[str, Any],
-        commits: Sequence[Mapping[str, Any]],
+        repo: Repo,
+        commits: Sequence[Commit],
     ) -> str | None: ...
 
+    async def summarize_many(self, requests: Sequence[SummaryRequest]) -> list[str | None]: ...
+
 
 class DisabledSummarizer:
     async def summarize(
         self,
-        repo: Mapping[str, Any],
-        commits: Sequence[Mapping[str, Any]],
+        repo: Repo,
+        commits: Sequence[Commit],
     ) -> str | None:
         return None
 
+    async def summarize_many(self, requests: Sequence[SummaryRequest]) -> list[str | None]:
+        return [None] * len(requests)
+
 
 class _PromptSummarizer:
     async def summarize(
         self,
-        repo: Mapping[str, Any],
-        commits: Sequence[Mapping[str, Any]],
+        repo: Repo,
+        commits: Sequence[Commit],
     ) -> str | None:
         messages = _meaningful_messages(commits)
         if len(messages) <= 1:
             return None
 
         prompt = _prompt(repo, messages, commit_count=len(commits))
-        raw_summary = await self._complete(prompt)
-        summary = raw_summary.strip().strip('`"').strip()
-        return None if summary.upper() == "NONE" else summary
+        return _clean_summary(await self._complete(prompt))
+
+    async def summarize_many(self, requests: Sequence[SummaryRequest]) -> list[str | None]:
+        return list(await asyncio.gather(*(self.summarize(repo, commits) for repo, commits in requests)))
 
     async def _complete(self, prompt: str) -> str:
         raise NotImplementedError
@@ -67,30 +83,246 @@ class CannedSummarizer(_PromptSummarizer):
         return self._response
 
 
-def build_summarizer(model: str | None) -> Summarizer:
-    return LiteLLMSummarizer(model) if model else DisabledSummarizer()
+class BatchingSummarizer:
+    def __init__(self, summarizer: _PromptSummarizer, *, token_budget: int = 4000) -> None:
+        self._summarizer = summarizer
+        self._token_budget = token_budget
+
+    async def summarize(
+        self,
+        repo: Repo,
+        commits: Sequence[Commit],
+    ) -> str | None:
+        return (await self.summarize_many([(repo, commits)]))[0]
+
+    async def summarize_many(self, requests: Sequence[SummaryRequest]) -> list[str | None]:
+        summaries: list[str | None] = [None] * len(requests)
+        sections: list[tuple[int, str]] = []
+        for index, (repo, commits) in enumerate(requests):
+            messages = _meaningful_messages(commits)
+            if len(messages) > 1:
+                sections.append((index, _repo_section(repo, messages, commit_count=len(commits))))
+
+        batches = _token_batches(sections, budget=self._token_budget)
+        answers = await asyncio.gather(*(self._summarize_batch(requests, batch) for batch in batches))
+        for batch_answers in answers:
+            for index, summary in batch_answers.items():
+                summaries[index] = summary
+        return summaries
+
+    async def _summarize_batch(
+        self,
+        requests: Sequence[SummaryRequest],
+        batch: Sequence[tuple[int, str]],
+    ) -> dict[int, str | None]:
+        if len(batch) == 1:
+            index, _ = batch[0]
+            return {index: await self._summarizer.summarize(*requests[index])}
+
+        try:
+            titles = _parse_batch_answer(
+                await self._summarizer._complete(_batch_prompt(section for _, section in batch))
+            )
+        except ValueError:
+            titles = {}
+
+        summaries: dict[int, str | None] = {}
+        fallback: list[int] = []
+        for index, _ in batch:
+            title = titles.get(requests[index][0].full_name)
+            if title is None:
+                fallback.append(index)
+            else:
+                summaries[index] = _clean_summary(title)
+        fallback_summaries = await asyncio.gather(*(self._summarizer.summarize(*requests[index]) for index in fallback))
+        summaries.update(zip(fallback, fallback_summaries, strict=True))
+        return summaries
+
+
+class CachedSummarizer:
+    def __init__(
+        self,
+        summarizer: Summarizer,
+        *,
+        cache_file: Path,
+        model: str,
+        now: Callable[[], datetime],
+        ttl: timedelta = timedelta(days=7),
+        max_entries: int = 2000,
+    ) -> None:
+        self._summarizer = summarizer
+        self._cache_file = cache_file
+        self._model = model
+        self._now = now
+        self._ttl = ttl
+        self._max_entries = max_entries
+        entries = self._load_entries()
+        self._entries = {key: entry for key, entry in entries.items() if not self._expired(entry)}
+        self._changed = len(self._entries) != len(entries)
+        self.hits = 0
+        self.misses = 0
+
+    async def summarize(
+        self,
+        repo: Repo,
+        commits: Sequence[Commit],
+    ) -> str | None:
+        return (await self.summarize_many([(repo, commits)]))[0]
+
+    async def summarize_many(self, requests: Sequence[SummaryRequest]) -> list[str | None]:
+        now = self._now().isoformat()
+        summaries: list[str | None] = [None] * len(requests)
+        missing: list[tuple[int, str]] = []
+        for index, (repo, commits) in enumerate(requests):
+            if len(_meaningful_messages(commits)) <= 1:
+                continue
+            key = self._key(repo, commits)
+            if (entry := self._entries.get(key)) is None or self._expired(entry):
+                missing.append((index, key))
+                continue
+            entry["used_at"] = now
+            summaries[index] = entry["summary"]
+            self.hits += 1
+            self._changed = True
+
+        if missing:
+            fresh = await self._summarizer.summarize_many([requests[index] for index, _ in missing])
+            for (index, key), summary in zip(missing, fresh, strict=True):
+                summaries[index] = summary
+                self._entries[key] = {"summary": summary, "created_at": now, "used_at": now}
+            self.misses += len(missing)
+            self._changed = True
+        return summaries
+
+    def save(self) -> None:
+        logger.info("Summary cache: %s hits, %s misses", self.hits, self.misses)
+        if not self._changed:
+            return
+        live = [(key, entry) for key, entry in self._entries.items() if not self._expired(entry)]
+        live.sort(key=lambda item: item[1]["used_at"], reverse=True)
+        self._entries = dict(live[: self._max_entries])
+
+        self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": 1, "entries": self._entries}
+        temporary_file = self._cache_file.with_suffix(f"{self._cache_file.suffix}.tmp")
+        temporary_file.write_text(json.dumps(data) + "\n")
+        temporary_file.replace(self._cache_file)
+        self._changed = False
+
+    def _expired(self, entry: Mapping[str, Any]) -> bool:
+        return entry["created_at"] < (self._now() - self._ttl).isoformat()
+
+    def _key(self, repo: Repo, commits: Sequence[Commit]) -> str:
+        material = [repo.full_name, self._model, _PROMPT_TEMPLATE, [commit.sha for commit in commits]]
+        return hashlib.sha256(json.dumps(material).encode()).hexdigest()
+
+    def _load_entries(self) -> dict[str, dict[str, Any]]:
+        if not self._cache_file.exists():
+            return {}
+
+        data = json.loads(self._cache_file.read_text())
+        if not isinstance(data, dict) or data.get("version") != 1 or not isinstance(data.get("entries"), dict):
+            raise ValueError("Unsupported summary cache file format")
+        return data["entries"]
+
+
+def build_summarizer(
+    model: str | None,
+    *,
+    batch_size: int = 1,
+    cache_file: Path | None = None,
+    now: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+) -> Summarizer:
+    if not model:
+        return DisabledSummarizer()
+    prompt_summarizer = LiteLLMSummarizer(model)
+    summarizer: Summarizer = BatchingSummarizer(prompt_summarizer) if batch_size > 1 else prompt_summarizer
+    if cache_file is None:
+        return summarizer
+    return CachedSummarizer(summarizer, cache_file=cache_file, model=model, now=now)
 
 
 def _meaningful_messages(
-    commits: Sequence[Mapping[str, Any]],
+    commits: Sequence[Commit],
 ) -> list[str]:
     messages: list[str] = []
     for commit in commits[:20]:
-        message = str(commit["commit"]["message"])
+        message = commit.message
         if message.startswith("Merge pull request"):
             continue
         messages.append(message.splitlines()[0])
     return messages
 
 
-def _prompt(repo: Mapping[str, Any], messages: Sequence[str], *, commit_count: int) -> str:
-    bullets = "\n".join(f"- {message}" for message in messages)
-    return f"""Repository: {repo["full_name"]}
-Description: {repo.get("description") or "No description"}
+def _clean_summary(raw_summary: str) -> str | None:
+    summary = raw_summary.strip().strip('`"').strip()
+    return None if summary.upper() == "NONE" else summary
+
+
+_SECTION_TEMPLATE = """Repository: {repo}
+Description: {description}
 Recent commits: {commit_count}
 
 Commit details:
-{bullets}
+{bullets}"""
+
+_PROMPT_TEMPLATE = f"""{_SECTION_TEMPLATE}
 
 Generate `<EXACTLY ONE emoji> <minimalistic title with no more than 80 characters>`.
 If nothing meaningful, return `NONE`."""
+
+
+def _repo_section(repo: Repo, messages: Sequence[str], *, commit_count: int) -> str:
+    return _SECTION_TEMPLATE.format(**_template_fields(repo, messages, commit_count=commit_count))
+
+
+def _prompt(repo: Repo, messages: Sequence[str], *, commit_count: int) -> str:
+    return _PROMPT_TEMPLATE.format(**_template_fields(repo, messages, commit_count=commit_count))
+
+
+def _template_fields(repo: Repo, messages: Sequence[str], *, commit_count: int) -> dict[str, Any]:
+    return {
+        "repo": repo.full_name,
+        "description": repo.description or "No description",
+        "commit_count": commit_count,
+        "bullets": "\n".join(f"- {message}" for message in messages),
+    }
+
+
+def _batch_prompt(sections: Iterable[str]) -> str:
+    repositories = "\n\n---\n\n".join(sections)
+    return f"""{repositories}
+
+For each repository above, generate `<EXACTLY ONE emoji> <minimalistic title with no more than 80 characters>`.
+If nothing meaningful, use `NONE` as its title.
+Answer with only a JSON object mapping each repository name to its title."""
+
+
+def _token_batches(sections: Sequence[tuple[int, str]], *, budget: int) -> list[list[tuple[int, str]]]:
+    batches: list[list[tuple[int, str]]] = []
+    batch_tokens = 0
+    for section in sections:
+        tokens = _estimate_tokens(section[1])
+        if not batches or batch_tokens + tokens > budget:
+            batches.append([])
+            batch_tokens = 0
+        batches[-1].append(section)
+        batch_tokens += tokens
+    return batches
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _parse_batch_answer(answer: str) -> dict[str, str]:
+    text = answer.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        titles = json.loads(text)
+    except json.JSONDecodeError as error:
+        raise ValueError("Batch summary answer is not JSON") from error
+    if not isinstance(titles, dict):
+        raise ValueError("Batch summary answer must be a JSON object")
+    return {str(name): title for name, title in titles.items() if isinstance(title, str)}
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from checkpoint import RunCheckpoint
+from commit_feed import FetchedCommits
+from records import Commit, Repo
+
+
+def commit(sha: str) -> dict:
+    return {
+        "sha": sha,
+        "url": f"https://api.github.com/commits/{sha}",
+        "author": {"login": "alice", "type": "User", "avatar_url": "https://example.com/alice.png"},
+        "commit": {
+            "message": f"Commit {sha}",
+            "author": {"date": "2026-07-17T07:00:00Z"},
+            "committer": {"date": "2026-07-17T07:00:00Z"},
+            "verification": {"verified": False},
+        },
+    }
+
+
+def test_checkpoint_round_trips_selection_fetches_and_summaries(tmp_path: Path) -> None:
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = RunCheckpoint(path)
+    repo = Repo.from_github(
+        {
+            "full_name": "org/project",
+            "html_url": "https://github.com/org/project",
+            "topics": ["python"],
+            "pushed_at": "2026-07-17T07:45:00Z",
+            "size": 42,
+        }
+    )
+    fetched = FetchedCommits(
+        repo_name="org/project",
+        commits=[Commit.from_github(commit("abc"))],
+        watermark=datetime(2026, 7, 17, 7, 0, tzinfo=timezone.utc),
+        head="abc",
+        total_count=120,
+        checked_at=datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc),
+    )
+    checkpoint.start([repo])
+    checkpoint.record_fetch(fetched)
+    checkpoint.record_summary("org/project", "✨ Summary")
+
+    restored = RunCheckpoint(path)
+
+    assert restored.selected_repos == [repo]
+    assert restored.fetched == {"org/project": fetched}
+    assert "verification" not in path.read_text()
+    assert restored.summaries == {"org/project": "✨ Summary"}
+
+
+def test_checkpoint_ignores_truncated_last_record_and_clears(tmp_path: Path) -> None:
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = RunCheckpoint(path)
+    checkpoint.start([Repo(full_name="org/project", html_url="https://github.com/org/project")])
+    with path.open("a") as file:
+        file.write('{"fetched": "org/project", "comm')
+
+    restored = RunCheckpoint(path)
+    restored.clear()
+
+    assert restored.selected_repos == [Repo(full_name="org/project", html_url="https://github.com/org/project")]
+    assert restored.fetched == {}
+    assert not path.exists()
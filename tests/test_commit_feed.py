@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import json
+import re
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from urllib.parse import parse_qs
@@ -7,10 +10,11 @@ from urllib.parse import parse_qs
 import httpx
 import pytest
 from commit_feed import CommitFeed, RateLimitError
-from github_client import GitHubClient
+from github_client import ETagCache, GitHubClient
+from records import Repo
 
 NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
-REPO = {"full_name": "owner/project"}
+REPO = Repo(full_name="owner/project", html_url="https://github.com/owner/project")
 
 
 def commit(
@@ -67,7 +71,7 @@ async def test_last_modified_advances_persisted_watermark(tmp_path: Path) -> Non
     watermark_file = tmp_path / "watermarks.json"
     async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
         first_feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
-        assert [item["sha"] for item in await first_feed.new_commits(REPO)] == ["new"]
+        assert [item.sha for item in await first_feed.new_commits(REPO)] == ["new"]
 
         reloaded_feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
         assert await reloaded_feed.new_commits(REPO) == []
@@ -94,7 +98,7 @@ async def test_missing_last_modified_advances_from_newest_commit(tmp_path: Path)
     watermark_file = tmp_path / "watermarks.json"
     async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
         feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
-        assert [item["sha"] for item in await feed.new_commits(REPO)] == [
+        assert [item.sha for item in await feed.new_commits(REPO)] == [
             "older",
             "newest",
         ]
@@ -133,7 +137,7 @@ async def test_bot_commits_are_filtered_but_advance_watermark(tmp_path: Path) ->
     watermark_file = tmp_path / "watermarks.json"
     async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
         feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
-        assert [item["sha"] for item in await feed.new_commits(REPO)] == ["human"]
+        assert [item.sha for item in await feed.new_commits(REPO)] == ["human"]
 
         reloaded_feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
         await reloaded_feed.new_commits(REPO)
@@ -220,7 +224,7 @@ async def test_all_commit_pages_are_returned_before_watermark_advances(
 
         commits = await feed.new_commits(REPO)
 
-    assert [item["sha"] for item in commits] == ["first-page", "second-page"]
+    assert [item.sha for item in commits] == ["first-page", "second-page"]
     assert [parse_qs(request.url.query.decode())["page"] for request in requests] == [
         ["1"],
         ["2"],
@@ -273,8 +277,457 @@ async def test_feed_owns_active_repo_freshness_and_rejects_naive_times(
             now=lambda: NOW,
         )
 
-        assert feed.is_active_repo({"pushed_at": "2026-07-17T07:00:00Z"})
-        assert not feed.is_active_repo({"pushed_at": "2026-07-01T07:00:00Z"})
-        assert not feed.is_active_repo({"pushed_at": None})
+        assert feed.is_active_repo(Repo.from_github({"full_name": "org/fresh", "pushed_at": "2026-07-17T07:00:00Z"}))
+        assert not feed.is_active_repo(
+            Repo.from_github({"full_name": "org/stale", "pushed_at": "2026-07-01T07:00:00Z"})
+        )
+        assert not feed.is_active_repo(Repo.from_github({"full_name": "org/empty", "pushed_at": None}))
         with pytest.raises(ValueError, match="timezone"):
-            feed.is_active_repo({"pushed_at": "2026-07-17T07:00:00"})
+            Repo.from_github({"full_name": "org/naive", "pushed_at": "2026-07-17T07:00:00"})
+
+
+def history_node(oid: str, committed_at: str, *, login: str | None = "alice") -> dict:
+    return {
+        "oid": oid,
+        "message": f"Commit {oid}",
+        "authoredDate": committed_at,
+        "committedDate": committed_at,
+        "author": {"user": {"login": login} if login is not None else None},
+    }
+
+
+@pytest.mark.asyncio
+async def test_graphql_backend_batches_history_and_falls_back_to_rest(tmp_path: Path) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/graphql":
+            body = json.loads(request.content)
+            assert body["variables"]["owner0"] == "org"
+            assert body["variables"]["since0"] == "2026-07-14T08:00:00+00:00"
+            assert "history(first: 100, since: $since2)" in body["query"]
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "r0": {
+                            "defaultBranchRef": {
+                                "target": {
+                                    "history": {
+                                        "pageInfo": {"hasNextPage": False},
+                                        "nodes": [
+                                            history_node("bot", "2026-07-17T07:30:00Z", login=None),
+                                            history_node("human", "2026-07-17T07:00:00Z"),
+                                        ],
+                                    }
+                                }
+                            }
+                        },
+                        "r1": {
+                            "defaultBranchRef": {
+                                "target": {"history": {"pageInfo": {"hasNextPage": True}, "nodes": []}}
+                            }
+                        },
+                        "r2": None,
+                    }
+                },
+            )
+        return httpx.Response(200, json=[commit(request.url.path, "2026-07-17T06:00:00Z")])
+
+    repos = [
+        Repo(full_name="org/batched", html_url="https://github.com/org/batched"),
+        Repo(full_name="org/busy", html_url="https://github.com/org/busy"),
+        Repo(full_name="org/missing", html_url="https://github.com/org/missing"),
+    ]
+    watermark_file = tmp_path / "watermarks.json"
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW, backend="graphql")
+        await feed.prepare(repos)
+        results = [[item.sha for item in await feed.new_commits(repo)] for repo in repos]
+        await feed.flush()
+
+    assert results == [["human"], ["/repos/org/busy/commits"], ["/repos/org/missing/commits"]]
+    assert [request.url.path for request in requests] == [
+        "/graphql",
+        "/repos/org/busy/commits",
+        "/repos/org/missing/commits",
+    ]
+    assert json.loads(watermark_file.read_text())["watermarks"]["org/batched"] == "2026-07-17T07:30:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_since_parameter_limits_changed_repo_to_relevant_pages(tmp_path: Path) -> None:
+    history = [commit(f"c{hour:03d}", f"2026-07-{10 + hour // 24:02d}T{hour % 24:02d}:30:00Z") for hour in range(180)]
+    history.reverse()
+    requests: list[httpx.Request] = []
+    transferred = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal transferred
+        requests.append(request)
+        since = parse_qs(request.url.query.decode())["since"][0]
+        relevant = [item for item in history if item["commit"]["committer"]["date"] >= since]
+        response = httpx.Response(200, json=relevant[:100])
+        transferred += len(response.content)
+        return response
+
+    watermark_file = tmp_path / "watermarks.json"
+    watermark_file.write_text(json.dumps({"version": 2, "watermarks": {"owner/project": "2026-07-17T08:30:00+00:00"}}))
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW + timedelta(hours=4))
+
+        commits = await feed.new_commits(REPO)
+
+    assert [item.sha for item in commits] == ["c179", "c178", "c177"]
+    assert [parse_qs(request.url.query.decode())["since"] for request in requests] == [["2026-07-17T08:30:00Z"]]
+    assert transferred < len(json.dumps(history[:100])) / 10
+
+
+@pytest.mark.asyncio
+async def test_repos_not_pushed_since_they_were_last_checked_skip_the_network(tmp_path: Path) -> None:
+    requested: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if request.url.path == "/repos/org/unknown/commits":
+            return httpx.Response(200, json=[commit("new", "2026-07-17T06:50:00Z")])
+        return httpx.Response(304)
+
+    watermark_file = tmp_path / "watermarks.json"
+    watermark_file.write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "watermarks": {"org/quiet": "2026-07-17T06:00:00+00:00", "org/skewed": "2026-07-17T06:00:00+00:00"},
+                "checked": {"org/quiet": "2026-07-17T07:30:00+00:00", "org/skewed": "2026-07-17T07:30:00+00:00"},
+            }
+        )
+    )
+    repos = [
+        Repo.from_github({"full_name": name, "pushed_at": pushed_at})
+        for name, pushed_at in [
+            ("org/quiet", "2026-07-17T07:00:00Z"),
+            ("org/skewed", "2026-07-17T07:28:00Z"),
+            ("org/unknown", "2026-07-17T07:00:00Z"),
+        ]
+    ]
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
+        assert [[item.sha for item in await feed.new_commits(repo)] for repo in repos] == [[], [], ["new"]]
+        await feed.flush()
+
+        next_run = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW + timedelta(days=1))
+        assert await next_run.new_commits(repos[2]) == []
+
+    assert requested == ["/repos/org/skewed/commits", "/repos/org/unknown/commits"]
+    assert feed.requests_avoided == 1
+    assert next_run.requests_avoided == 1
+    assert json.loads(watermark_file.read_text())["checked"]["org/unknown"] == NOW.isoformat()
+
+
+@pytest.mark.asyncio
+async def test_compare_backend_anchors_on_head_sha_and_falls_back_to_dates(tmp_path: Path) -> None:
+    requested: list[str] = []
+    revalidated: list[str] = []
+    refs = {"org/busy": "head-1", "org/quiet": "quiet-head", "org/rebased": "rewritten"}
+    comparisons = {
+        "/repos/org/busy/compare/head-1...head-2": {
+            "status": "ahead",
+            "total_commits": 2,
+            "commits": [commit("backdated", "2026-07-15T09:00:00Z"), commit("head-2", "2026-07-17T07:50:00Z")],
+        },
+        "/repos/org/rebased/compare/gone...rewritten": {"status": "diverged", "total_commits": 1, "commits": []},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if "/git/ref/heads/" in request.url.path:
+            name = request.url.path.removeprefix("/repos/").removesuffix("/git/ref/heads/main")
+            etag = f'"{refs[name]}"'
+            if request.headers.get("If-None-Match") == etag:
+                revalidated.append(name)
+                return httpx.Response(304)
+            return httpx.Response(200, headers={"ETag": etag}, json={"object": {"sha": refs[name]}})
+        if (comparison := comparisons.get(request.url.path)) is not None:
+            return httpx.Response(200, json=comparison)
+        if request.url.path == "/repos/org/busy/commits":
+            return httpx.Response(200, json=[commit("head-1", "2026-07-17T06:00:00Z")])
+        return httpx.Response(200, json=[commit("rewritten", "2026-07-17T07:40:00Z")])
+
+    watermark_file = tmp_path / "watermarks.json"
+    watermark_file.write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "watermarks": {"org/quiet": "2026-07-17T07:00:00+00:00", "org/rebased": "2026-07-17T07:00:00+00:00"},
+                "heads": {"org/quiet": "quiet-head", "org/rebased": "gone"},
+            }
+        )
+    )
+    busy, quiet, rebased = (
+        Repo.from_github({"full_name": name, "default_branch": "main"})
+        for name in ("org/busy", "org/quiet", "org/rebased")
+    )
+    async with GitHubClient(
+        "token", transport=httpx.MockTransport(handler), etag_cache=ETagCache(tmp_path / "etags.json")
+    ) as transport:
+        feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW, backend="compare")
+        assert [item.sha for item in await feed.new_commits(busy)] == ["head-1"]
+        assert await feed.new_commits(quiet) == []
+        assert await feed.new_commits(quiet) == []
+        assert [item.sha for item in await feed.new_commits(rebased)] == ["rewritten"]
+        await feed.flush()
+
+        refs["org/busy"] = "head-2"
+        reloaded_feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW, backend="compare")
+        assert [item.sha for item in await reloaded_feed.new_commits(busy)] == ["head-2", "backdated"]
+        await reloaded_feed.flush()
+
+    assert requested == [
+        "/repos/org/busy/commits",
+        "/repos/org/quiet/git/ref/heads/main",
+        "/repos/org/quiet/git/ref/heads/main",
+        "/repos/org/rebased/git/ref/heads/main",
+        "/repos/org/rebased/compare/gone...rewritten",
+        "/repos/org/rebased/commits",
+        "/repos/org/busy/git/ref/heads/main",
+        "/repos/org/busy/compare/head-1...head-2",
+    ]
+    assert revalidated == ["org/quiet"]
+    assert json.loads(watermark_file.read_text())["heads"] == {
+        "org/busy": "head-2",
+        "org/quiet": "quiet-head",
+        "org/rebased": "rewritten",
+    }
+
+
+@pytest.mark.asyncio
+async def test_head_probe_skips_fetches_for_unchanged_branches(tmp_path: Path) -> None:
+    requested: list[str] = []
+    refs = {"org/quiet": "quiet-head", "org/moved": "new-head"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        if "/git/ref/heads/" in request.url.path:
+            name = request.url.path.removeprefix("/repos/").removesuffix("/git/ref/heads/main")
+            etag = f'"{refs[name]}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304)
+            return httpx.Response(200, headers={"ETag": etag}, json={"object": {"sha": refs[name]}})
+        return httpx.Response(200, json=[commit("new-head", "2026-07-17T07:40:00Z")])
+
+    watermark_file = tmp_path / "watermarks.json"
+    watermark_file.write_text(
+        json.dumps(
+            {
+                "version": 2,
+                "watermarks": {"org/quiet": "2026-07-17T07:00:00+00:00", "org/moved": "2026-07-17T07:00:00+00:00"},
+                "heads": {"org/quiet": "quiet-head", "org/moved": "old-head"},
+            }
+        )
+    )
+    repos = [Repo.from_github({"full_name": name, "default_branch": "main"}) for name in ("org/quiet", "org/moved")]
+    async with GitHubClient(
+        "token", transport=httpx.MockTransport(handler), etag_cache=ETagCache(tmp_path / "etags.json")
+    ) as transport:
+        first = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW, probe="head")
+        await first.prepare(repos)
+        assert [[item.sha for item in await first.new_commits(repo)] for repo in repos] == [[], ["new-head"]]
+        await first.flush()
+
+        second = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW, probe="head")
+        await second.prepare(repos)
+        assert [await second.new_commits(repo) for repo in repos] == [[], []]
+
+    assert requested == [
+        "/repos/org/quiet/git/ref/heads/main",
+        "/repos/org/moved/git/ref/heads/main",
+        "/repos/org/moved/commits",
+        "/repos/org/quiet/git/ref/heads/main",
+        "/repos/org/moved/git/ref/heads/main",
+    ]
+    assert (first.fetches_skipped, second.fetches_skipped) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_search_probe_packs_repos_per_query_and_fetches_only_repos_with_hits(tmp_path: Path) -> None:
+    names = [f"organization/repository-{index:02d}" for index in range(12)]
+    queries: list[list[str]] = []
+    fetched: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/search/commits":
+            query = request.url.params["q"]
+            assert query.endswith("committer-date:>2026-07-14T08:00:00Z")
+            queries.append(re.findall(r"repo:(\S+)", query))
+            items: list[dict] = []
+            total_count = 0
+            if "organization/repository-03" in queries[-1]:
+                items = [
+                    {"sha": f"busy-{index}", "repository": {"full_name": "organization/repository-03"}}
+                    for index in range(100)
+                ]
+                total_count = 150
+            if "organization/repository-09" in queries[-1]:
+                items.append({"sha": "abc", "repository": {"full_name": "organization/repository-09"}})
+                total_count += 1
+            return httpx.Response(200, json={"total_count": total_count, "incomplete_results": False, "items": items})
+        fetched.append(request.url.path)
+        return httpx.Response(200, json=[commit("abc", "2026-07-17T07:40:00Z")])
+
+    repos = [Repo.from_github({"full_name": name}) for name in names]
+    repos.append(Repo.from_github({"full_name": "organization/fork", "fork": True}))
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(
+            transport,
+            watermark_file=tmp_path / "watermarks.json",
+            now=lambda: NOW,
+            probe="search",
+            probe_batch_size=5,
+        )
+        await feed.prepare(repos)
+        for repo in repos:
+            await feed.new_commits(repo)
+
+    assert sorted(queries) == sorted(
+        [
+            names[0:5],
+            names[5:10],
+            names[10:12],
+            [name for name in names[0:5] if name != "organization/repository-03"],
+        ]
+    )
+    assert fetched == [
+        "/repos/organization/repository-03/commits",
+        "/repos/organization/repository-09/commits",
+        "/repos/organization/fork/commits",
+    ]
+    assert feed.fetches_skipped == 10
+
+
+@pytest.mark.asyncio
+async def test_fetch_limit_keeps_first_commits_and_estimates_the_rest_from_link_header(tmp_path: Path) -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        per_page = int(request.url.params["per_page"])
+        links = (
+            f'<https://api.github.com/repos/owner/project/commits?per_page={per_page}&page=2>; rel="next", '
+            f"<https://api.github.com/repos/owner/project/commits?per_page={per_page}&page={2000 // per_page}>; "
+            'rel="last"'
+        )
+        page = [
+            commit(
+                f"c{minute:04d}",
+                f"2026-07-17T07:{59 - minute % 60:02d}:00Z",
+                author={"login": "renovate[bot]", "type": "Bot"} if minute % 5 == 4 else None,
+            )
+            for minute in range(per_page)
+        ]
+        return httpx.Response(200, headers={"Link": links}, json=page)
+
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(transport, watermark_file=tmp_path / "watermarks.json", now=lambda: NOW, fetch_limit=5)
+
+        fetched = await feed.fetch(REPO)
+
+    assert [item.sha for item in fetched.commits] == ["c0000", "c0001", "c0002", "c0003"]
+    assert fetched.commit_count == 1600
+    assert [request.url.params["per_page"] for request in requests] == ["5", "1"]
+
+
+@pytest.mark.asyncio
+async def test_failed_count_reports_the_fetched_commits_and_warns(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params["per_page"] == "1":
+            return httpx.Response(502)
+        links = '<https://api.github.com/repos/owner/project/commits?per_page=2&page=2>; rel="next"'
+        page = [commit("c0", "2026-07-17T07:50:00Z"), commit("c1", "2026-07-17T07:40:00Z")]
+        return httpx.Response(200, headers={"Link": links}, json=page)
+
+    caplog.set_level("WARNING", logger="stargazer")
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(transport, watermark_file=tmp_path / "watermarks.json", now=lambda: NOW, fetch_limit=2)
+
+        fetched = await feed.fetch(REPO)
+
+    assert fetched.commit_count == 2
+    assert "Counting commits for owner/project failed with 502" in caplog.text
+
+
+class CommitPageStream(httpx.AsyncByteStream):
+    def __init__(self, page: list[dict]) -> None:
+        self.page = page
+        self.sent: list[str] = []
+        self.closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield b"["
+        for index, item in enumerate(self.page):
+            self.sent.append(item["sha"])
+            yield (b"," if index else b"") + json.dumps(item).encode()
+        yield b"]"
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_commit_page_stream_is_closed_once_the_cutoff_is_crossed(tmp_path: Path) -> None:
+    page = [commit(f"c{hour:02d}", f"2026-07-17T{hour:02d}:30:00Z") for hour in range(7, -1, -1)]
+    body = CommitPageStream(page)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=body)
+
+    watermark_file = tmp_path / "watermarks.json"
+    watermark_file.write_text(json.dumps({"version": 2, "watermarks": {"owner/project": "2026-07-17T05:30:00+00:00"}}))
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
+
+        commits = await feed.new_commits(REPO)
+
+    assert [item.sha for item in commits] == ["c07", "c06"]
+    assert body.sent == ["c07", "c06", "c05"]
+    assert body.closed
+
+
+@pytest.mark.asyncio
+async def test_watermarks_are_journaled_until_flushed_into_snapshot(tmp_path: Path) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"Last-Modified": "Fri, 17 Jul 2026 07:30:00 GMT"},
+            json=[commit(request.url.path, "2026-07-17T07:00:00Z")],
+        )
+
+    watermark_file = tmp_path / "watermarks.json"
+    journal_file = tmp_path / "watermarks.json.journal"
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        feed = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
+        await feed.new_commits(Repo(full_name="org/first", html_url="https://github.com/org/first"))
+        await feed.new_commits(Repo(full_name="org/second", html_url="https://github.com/org/second"))
+
+        assert not watermark_file.exists()
+        assert len(journal_file.read_text().splitlines()) == 2
+        with journal_file.open("a") as journal:
+            journal.write('{"repo": "org/torn", "water')
+        reloaded = CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW)
+        await reloaded.flush()
+
+    assert not journal_file.exists()
+    assert json.loads(watermark_file.read_text()) == {
+        "version": 2,
+        "watermarks": {
+            "org/first": "2026-07-17T07:30:00+00:00",
+            "org/second": "2026-07-17T07:30:00+00:00",
+        },
+        "checked": {
+            "org/first": "2026-07-17T08:00:00+00:00",
+            "org/second": "2026-07-17T08:00:00+00:00",
+        },
+    }
@@ -35,6 +35,16 @@ def test_config_parses_environment_overrides() -> None:
             "SUMMARIZER_MODEL": "deepseek/deepseek-chat",
             "GITHUB_ACTIONS": "true",
             "GITHUB_OUTPUT": "/tmp/github-output",
+            "FETCH_CONCURRENCY": " 8 ",
+            "SUMMARIZE_CONCURRENCY": "4",
+            "SUMMARY_BATCH_SIZE": "5",
+            "COMMIT_BACKEND": "graphql",
+            "RATE_LIMIT_MAX_WAIT": "60",
+            "STATE_DB": "state.db",
+            "STARRED_PAGE_TOLERANCE": "3",
+            "STARRED_PAGE_CONCURRENCY": "2",
+            "COMMIT_PROBE": "head",
+            "COMMIT_FETCH_LIMIT": "20",
         },
         default_date=date(2026, 7, 17),
     )
@@ -47,6 +57,16 @@ def test_config_parses_environment_overrides() -> None:
         summarizer_model="deepseek/deepseek-chat",
         is_ci=True,
         github_output=Path("/tmp/github-output"),
+        fetch_concurrency=8,
+        summarize_concurrency=4,
+        summary_batch_size=5,
+        commit_backend="graphql",
+        rate_limit_wait=60,
+        state_db=Path("state.db"),
+        starred_page_tolerance=3,
+        starred_page_concurrency=2,
+        commit_probe="head",
+        commit_fetch_limit=20,
     )
 
 
@@ -62,6 +82,14 @@ def test_config_fails_fast_without_github_token() -> None:
         Config.from_environment({}, default_date=date(2026, 7, 17))
 
 
+def test_config_rejects_unknown_commit_backend() -> None:
+    with pytest.raises(ValueError, match="COMMIT_BACKEND"):
+        Config.from_environment(
+            {"GITHUB_TOKEN": "secret", "COMMIT_BACKEND": "soap"},
+            default_date=date(2026, 7, 17),
+        )
+
+
 def test_ci_config_fails_fast_without_report_date() -> None:
     with pytest.raises(ValueError, match="TODAY environment variable is required"):
         Config.from_environment(
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime, timezone
+from pathlib import Path
 from urllib.parse import parse_qs
 
 import httpx
 import pytest
-from github_client import GitHubClient
+from github_client import ETagCache, GitHubClient
 
 
 @pytest.mark.asyncio
@@ -32,3 +35,178 @@ async def test_starred_transport_yields_updated_pages_until_empty() -> None:
         {"per_page": ["25"], "page": ["2"], "sort": ["updated"], "direction": ["desc"]},
         {"per_page": ["25"], "page": ["3"], "sort": ["updated"], "direction": ["desc"]},
     ]
+
+
+@pytest.mark.asyncio
+async def test_requests_are_sent_to_the_configured_base_url() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"object": {"sha": "abc"}})
+
+    async with GitHubClient(
+        "token", base_url="http://127.0.0.1:8080", transport=httpx.MockTransport(handler)
+    ) as transport:
+        head = await transport.branch_head("org/project", "main")
+
+    assert head == "abc"
+    assert [str(request.url) for request in requests] == ["http://127.0.0.1:8080/repos/org/project/git/ref/heads/main"]
+
+
+@pytest.mark.asyncio
+async def test_starred_pages_are_revalidated_with_persisted_etags(tmp_path: Path) -> None:
+    cache_file = tmp_path / "etags.json"
+    pages = {"1": [{"full_name": "org/first"}], "2": []}
+
+    def first_handler(request: httpx.Request) -> httpx.Response:
+        page = parse_qs(request.url.query.decode())["page"][0]
+        return httpx.Response(200, headers={"ETag": f'"page-{page}"'}, json=pages[page])
+
+    async with GitHubClient(
+        "token", transport=httpx.MockTransport(first_handler), etag_cache=ETagCache(cache_file)
+    ) as transport:
+        assert [page async for page in transport.starred_repo_pages()] == [[{"full_name": "org/first"}]]
+
+    requests: list[httpx.Request] = []
+
+    def revalidating_handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(304)
+
+    async with GitHubClient(
+        "token", transport=httpx.MockTransport(revalidating_handler), etag_cache=ETagCache(cache_file)
+    ) as transport:
+        assert [page async for page in transport.starred_repo_pages()] == [[{"full_name": "org/first"}]]
+
+    assert [request.headers["if-none-match"] for request in requests] == ['"page-1"', '"page-2"']
+
+
+@pytest.mark.asyncio
+async def test_starred_pages_after_the_first_are_fetched_concurrently_and_yielded_in_order() -> None:
+    requested_pages: list[int] = []
+    cancelled_pages: list[int] = []
+    finished_pages: list[int] = []
+    slow_pages: set[int] = set()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        page = int(request.url.params["page"])
+        requested_pages.append(page)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            await asyncio.sleep(0.01 * (6 - page))
+            if page in slow_pages:
+                await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled_pages.append(page)
+            raise
+        finally:
+            in_flight -= 1
+        finished_pages.append(page)
+        return httpx.Response(
+            200,
+            headers={"Link": '<https://api.github.com/user/starred?per_page=100&page=5>; rel="last"'},
+            json=[{"full_name": f"org/page-{page}"}],
+        )
+
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        pages = [page async for page in transport.starred_repo_pages(concurrency=4)]
+
+        assert [page[0]["full_name"] for page in pages] == [f"org/page-{page}" for page in range(1, 6)]
+        assert max_in_flight == 4
+
+        requested_pages.clear()
+        finished_pages.clear()
+        slow_pages.add(3)
+        listing = transport.starred_repo_pages(concurrency=2)
+        assert (await anext(listing))[0]["full_name"] == "org/page-1"
+        assert (await anext(listing))[0]["full_name"] == "org/page-2"
+        await listing.aclose()
+
+    assert requested_pages == [1, 2, 3]
+    assert finished_pages == [1, 2, 3]
+    assert cancelled_pages == []
+    assert in_flight == 0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_784_280_000.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.mark.asyncio
+async def test_secondary_rate_limit_is_retried_after_backoff() -> None:
+    clock = FakeClock()
+    responses = [
+        httpx.Response(403, headers={"Retry-After": "30"}, json={"message": "secondary rate limit"}),
+        httpx.Response(403, json={"message": "You have exceeded a secondary rate limit."}),
+        httpx.Response(200, json=[]),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    async with GitHubClient(
+        "token", transport=httpx.MockTransport(handler), rate_limit_wait=300, clock=clock, sleep=clock.sleep
+    ) as transport:
+        response = await transport.request_commits("org/project", modified_since=datetime.now(timezone.utc), page=2)
+
+    assert response.status_code == 200
+    assert clock.sleeps == [30, 120]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_reset_beyond_deadline_is_returned_without_waiting() -> None:
+    clock = FakeClock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            403,
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(clock.now + 3600))},
+        )
+
+    async with GitHubClient(
+        "token", transport=httpx.MockTransport(handler), rate_limit_wait=600, clock=clock, sleep=clock.sleep
+    ) as transport:
+        response = await transport.request_commits("org/project", modified_since=datetime.now(timezone.utc), page=1)
+
+    assert response.status_code == 403
+    assert clock.sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_low_remaining_budget_paces_requests_until_reset() -> None:
+    clock = FakeClock()
+    reset = clock.now + 20
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": "4",
+                "X-RateLimit-Reset": str(int(reset)),
+                "X-RateLimit-Resource": "core",
+            },
+            json=[],
+        )
+
+    async with GitHubClient(
+        "token", transport=httpx.MockTransport(handler), rate_limit_wait=600, clock=clock, sleep=clock.sleep
+    ) as transport:
+        for page in (1, 2):
+            await transport.request_commits("org/project", modified_since=datetime.now(timezone.utc), page=page)
+
+    assert clock.sleeps == [5]
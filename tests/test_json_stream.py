@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from json_stream import iter_json, iter_json_array, write_json
+
+DOCUMENT = json.dumps(
+    [
+        {"sha": "abc", "message": "Add ✨ feature", "parents": [{"sha": "def"}]},
+        123,
+        -4.5e2,
+        "text with ] and , inside",
+        True,
+        None,
+        [],
+    ],
+    ensure_ascii=False,
+    indent=2,
+).encode()
+
+
+async def chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(DOCUMENT)])
+async def test_array_items_match_full_decode_for_any_chunking(size: int) -> None:
+    items = [item async for item in iter_json_array(chunks(DOCUMENT, size))]
+
+    assert items == json.loads(DOCUMENT)
+
+
+@pytest.mark.asyncio
+async def test_empty_array_yields_nothing() -> None:
+    assert [item async for item in iter_json_array(chunks(b" [ ] ", 1))] == []
+
+
+@pytest.mark.asyncio
+async def test_non_array_document_is_rejected() -> None:
+    with pytest.raises(TypeError, match="array"):
+        [item async for item in iter_json_array(chunks(b'{"message": "Not Found"}', 4))]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("document", [b'[{"sha": "abc"}', b'[{"sha": "abc"} {"sha": "def"}]', b"[1, 2] 3"])
+async def test_malformed_arrays_raise_decode_errors(document: bytes) -> None:
+    with pytest.raises(json.JSONDecodeError):
+        [item async for item in iter_json_array(chunks(document, 3))]
+
+
+def test_json_writer_matches_json_dumps_and_streams_iterables(tmp_path: Path) -> None:
+    document: dict[str, Any] = {
+        "total": 2,
+        "empty": {},
+        "repos": [{"name": "org/✨", "commits": [], "tags": ["a", None, 1.5]}, {"name": "org/b", "nested": {"x": []}}],
+    }
+    expected = json.dumps(document, ensure_ascii=False, indent=2)
+
+    assert "".join(iter_json(document)) == expected
+    write_json(tmp_path / "report.json", {**document, "repos": iter(document["repos"])})
+    assert (tmp_path / "report.json").read_text(encoding="utf-8") == expected
+    assert "".join(iter_json({"repos": iter([])})) == json.dumps({"repos": []}, indent=2)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from collections import Counter
-from datetime import date, datetime, timezone
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 import httpx
@@ -11,7 +13,10 @@ from commit_feed import CommitFeed
 from config import Config
 from github_client import GitHubClient
 from pipeline import run_daily
-from summarizer import CannedSummarizer, DisabledSummarizer
+from records import Commit, Repo
+from report_segments import ReportSegments
+from state_store import StateStore
+from summarizer import CannedSummarizer, DisabledSummarizer, SummaryRequest
 
 NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
 
@@ -91,6 +96,7 @@ async def test_full_daily_run_and_same_day_rerun_use_fake_adapters(
             report_dir=report_dir,
             published_at=NOW,
         )
+        first_repos = first.load_report()["repos"]
         second = await run_daily(
             config,
             transport=transport,
@@ -100,7 +106,7 @@ async def test_full_daily_run_and_same_day_rerun_use_fake_adapters(
             published_at=NOW,
         )
 
-    assert first.report["repos"] == [
+    assert first_repos == [
         {
             "name": "org/alpha",
             "url": "https://github.com/org/alpha",
@@ -122,12 +128,12 @@ async def test_full_daily_run_and_same_day_rerun_use_fake_adapters(
             "topics": ["python"],
         }
     ]
-    assert second.report == {
+    assert second.load_report() == {
         "total_repos_count": 2,
         "active_repos_count": 2,
         "total_commits_count": 3,
         "repos": [
-            first.report["repos"][0],
+            first_repos[0],
             {
                 "name": "org/beta",
                 "url": "https://github.com/org/beta",
@@ -146,7 +152,7 @@ async def test_full_daily_run_and_same_day_rerun_use_fake_adapters(
         ],
     }
     assert (
-        second.markdown
+        second.load_markdown()
         == """# Recent Activity in Starred Repositories
 _2 active repos with 3 new commits_
 
@@ -156,7 +162,7 @@ _2 active repos with 3 new commits_
 
 ## Other"""
     )
-    assert second.feed == {
+    assert second.load_feed() == {
         "version": "https://jsonfeed.org/version/1.1",
         "title": "GitHub Starred Repositories Activity",
         "home_page_url": "https://github.com/RoCry/git-stargazer/releases/latest",
@@ -204,9 +210,9 @@ _2 active repos with 3 new commits_
             },
         ],
     }
-    assert json.loads(second.report_path.read_text()) == second.report
-    assert second.markdown_path.read_text() == second.markdown
-    assert json.loads(second.feed_path.read_text()) == second.feed
+    assert json.loads(second.report_path.read_text()) == second.load_report()
+    assert second.markdown_path.read_text() == second.load_markdown()
+    assert json.loads(second.feed_path.read_text()) == second.load_feed()
     assert request_counts["/repos/org/alpha/commits"] == 1
     assert request_counts["/repos/org/beta/commits"] == 1
     assert request_counts["/user/starred"] == 2
@@ -245,7 +251,7 @@ async def test_rate_limit_stops_run_cleanly(tmp_path: Path) -> None:
             published_at=NOW,
         )
 
-    assert artifacts.report == {
+    assert artifacts.load_report() == {
         "total_repos_count": 0,
         "active_repos_count": 0,
         "total_commits_count": 0,
@@ -293,10 +299,434 @@ async def test_empty_streak_short_circuits_commit_fetching(tmp_path: Path) -> No
             published_at=NOW,
         )
 
-    assert artifacts.report["total_repos_count"] == 2
+    assert artifacts.load_report()["total_repos_count"] == 2
     assert "/repos/org/must-not-fetch/commits" not in requested_paths
 
 
+@pytest.mark.asyncio
+async def test_starred_listing_stops_after_tolerated_stale_pages(
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    requested_pages: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/user/starred":
+            page = int(request.url.params["page"])
+            requested_pages.append(page)
+            if page >= 4:
+                raise AssertionError("Starred listing kept paging past stale pages")
+            repo = starred_repo(f"org/page-{page}", "Repo")
+            if page > 1:
+                repo["pushed_at"] = "2026-06-01T00:00:00Z"
+            return httpx.Response(
+                200,
+                headers={"Link": '<https://api.github.com/user/starred?page=5>; rel="last"'},
+                json=[repo],
+            )
+        return httpx.Response(200, json=[commit("abc", "Change", "2026-07-17T07:00:00Z")])
+
+    config = Config(
+        github_token="token",
+        report_date=date(2026, 7, 17),
+        repo_limit=10,
+        empty_streak_limit=10,
+        summarizer_model=None,
+        is_ci=False,
+        github_output=None,
+        fetch_concurrency=4,
+        starred_page_tolerance=1,
+    )
+    caplog.set_level("INFO", logger="stargazer")
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        artifacts = await run_daily(
+            config,
+            transport=transport,
+            commit_feed=CommitFeed(transport, watermark_file=tmp_path / "watermarks.json", now=lambda: NOW),
+            summarizer=DisabledSummarizer(),
+            report_dir=tmp_path / "reports",
+            published_at=NOW,
+        )
+
+    assert [repo["name"] for repo in artifacts.load_report()["repos"]] == ["org/page-1"]
+    assert requested_pages == [1, 2, 3]
+    assert "2 pages skipped" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetching_keeps_order_and_discards_speculative_work(
+    tmp_path: Path,
+) -> None:
+    repos = [starred_repo(f"org/{name}", name) for name in ("first", "second", "third", "slow", "fast")]
+    in_flight = 0
+    max_in_flight = 0
+    finished: list[str] = []
+    requested_pages: list[tuple[str, str | None]] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        if request.url.path == "/user/starred":
+            return httpx.Response(200, json=repos)
+        requested_pages.append((request.url.path, request.url.params.get("page")))
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            match request.url.path:
+                case "/repos/org/first/commits":
+                    await asyncio.sleep(0.01)
+                    return httpx.Response(200, json=[commit("aaaaaaa111", "Add first", "2026-07-17T07:00:00Z")])
+                case "/repos/org/slow/commits" if request.url.params.get("page") == "1":
+                    await asyncio.sleep(0.05)
+                    return httpx.Response(
+                        200,
+                        json=[commit("ccccccc333", "Add slow", "2026-07-17T07:20:00Z")],
+                        headers={"Link": '<https://api.github.com/repos/org/slow/commits?page=2>; rel="next"'},
+                    )
+                case "/repos/org/fast/commits":
+                    return httpx.Response(200, json=[commit("bbbbbbb222", "Add fast", "2026-07-17T07:10:00Z")])
+                case _:
+                    return httpx.Response(200, json=[])
+        finally:
+            in_flight -= 1
+            finished.append(request.url.path)
+
+    config = Config(
+        github_token="token",
+        report_date=date(2026, 7, 17),
+        repo_limit=5,
+        empty_streak_limit=2,
+        summarizer_model=None,
+        is_ci=False,
+        github_output=None,
+        fetch_concurrency=4,
+    )
+    watermark_file = tmp_path / "watermarks.json"
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        artifacts = await run_daily(
+            config,
+            transport=transport,
+            commit_feed=CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW),
+            summarizer=DisabledSummarizer(),
+            report_dir=tmp_path / "reports",
+            published_at=NOW,
+        )
+
+    assert [repo["name"] for repo in artifacts.load_report()["repos"]] == ["org/first", "org/second", "org/third"]
+    assert max_in_flight > 1
+    assert in_flight == 0
+    assert "/repos/org/slow/commits" in finished
+    assert ("/repos/org/slow/commits", "2") not in requested_pages
+    assert list(json.loads(watermark_file.read_text())["watermarks"]) == ["org/first"]
+
+
+class GatedSummarizer:
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+
+    async def summarize(self, repo: Repo, commits: Sequence[Commit]) -> str | None:
+        if repo.full_name == "org/first":
+            await self.release.wait()
+        return f"Summary {repo.full_name}"
+
+    async def summarize_many(self, requests: Sequence[SummaryRequest]) -> list[str | None]:
+        return [await self.summarize(repo, commits) for repo, commits in requests]
+
+
+@pytest.mark.asyncio
+async def test_summarization_overlaps_fetching_and_rows_keep_selection_order(
+    tmp_path: Path,
+) -> None:
+    repos = [starred_repo("org/first", "First"), starred_repo("org/second", "Second")]
+    summarizer = GatedSummarizer()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/user/starred":
+            return httpx.Response(200, json=repos)
+        if request.url.path == "/repos/org/second/commits":
+            summarizer.release.set()
+        return httpx.Response(200, json=[commit(request.url.path, "Change", "2026-07-17T07:00:00Z")])
+
+    config = Config(
+        github_token="token",
+        report_date=date(2026, 7, 17),
+        repo_limit=2,
+        empty_streak_limit=10,
+        summarizer_model=None,
+        is_ci=False,
+        github_output=None,
+        summarize_concurrency=2,
+    )
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        artifacts = await asyncio.wait_for(
+            run_daily(
+                config,
+                transport=transport,
+                commit_feed=CommitFeed(transport, watermark_file=tmp_path / "watermarks.json", now=lambda: NOW),
+                summarizer=summarizer,
+                report_dir=tmp_path / "reports",
+                published_at=NOW,
+            ),
+            timeout=5,
+        )
+
+    assert [(repo["name"], repo["summary"]) for repo in artifacts.load_report()["repos"]] == [
+        ("org/first", "Summary org/first"),
+        ("org/second", "Summary org/second"),
+    ]
+
+
+class FailingSummarizer:
+    async def summarize(self, repo: Repo, commits: Sequence[Commit]) -> str | None:
+        return (await self.summarize_many([(repo, commits)]))[0]
+
+    async def summarize_many(self, requests: Sequence[SummaryRequest]) -> list[str | None]:
+        if any(repo.full_name == "org/second" for repo, _ in requests):
+            raise RuntimeError("Summarizer outage")
+        return [f"Summary {repo.full_name}" for repo, _ in requests]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_resumes_from_checkpoint_without_refetching(tmp_path: Path) -> None:
+    repos = [starred_repo("org/first", "First"), starred_repo("org/second", "Second")]
+    request_counts: Counter[str] = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        request_counts[request.url.path] += 1
+        if request.url.path == "/user/starred":
+            return httpx.Response(200, json=repos)
+        return httpx.Response(200, json=[commit(request.url.path, "Change", "2026-07-17T07:00:00Z")])
+
+    config = Config(
+        github_token="token",
+        report_date=date(2026, 7, 17),
+        repo_limit=2,
+        empty_streak_limit=10,
+        summarizer_model=None,
+        is_ci=False,
+        github_output=None,
+    )
+    report_dir = tmp_path / "reports"
+    watermark_file = tmp_path / "watermarks.json"
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        with pytest.raises(ExceptionGroup):
+            await run_daily(
+                config,
+                transport=transport,
+                commit_feed=CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW),
+                summarizer=FailingSummarizer(),
+                report_dir=report_dir,
+                published_at=NOW,
+            )
+        assert (report_dir / "checkpoint_2026-07-17.jsonl").exists()
+        assert not watermark_file.exists()
+        assert not (tmp_path / "watermarks.json.journal").exists()
+
+        artifacts = await run_daily(
+            config,
+            transport=transport,
+            commit_feed=CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW),
+            summarizer=CannedSummarizer("must not be used"),
+            report_dir=report_dir,
+            published_at=NOW,
+        )
+
+    assert [(repo["name"], repo["commit_count"], repo["summary"]) for repo in artifacts.load_report()["repos"]] == [
+        ("org/first", 1, "Summary org/first"),
+        ("org/second", 1, None),
+    ]
+    assert request_counts == {"/user/starred": 1, "/repos/org/first/commits": 1, "/repos/org/second/commits": 1}
+    assert not (report_dir / "checkpoint_2026-07-17.jsonl").exists()
+    assert list(json.loads(watermark_file.read_text())["watermarks"]) == ["org/first", "org/second"]
+
+
+@pytest.mark.asyncio
+async def test_failed_run_leaves_unreported_commits_for_the_next_day(tmp_path: Path) -> None:
+    repos = [starred_repo("org/first", "First"), starred_repo("org/second", "Second")]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/user/starred":
+            return httpx.Response(200, json=repos)
+        since = request.url.params.get("since")
+        if since is not None and since > "2026-07-17T07:00:00Z":
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=[commit(request.url.path, "Change", "2026-07-17T07:00:00Z")])
+
+    def daily_config(report_date: date) -> Config:
+        return Config(
+            github_token="token",
+            report_date=report_date,
+            repo_limit=2,
+            empty_streak_limit=10,
+            summarizer_model=None,
+            is_ci=False,
+            github_output=None,
+        )
+
+    watermark_file = tmp_path / "watermarks.json"
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        with pytest.raises(ExceptionGroup):
+            await run_daily(
+                daily_config(date(2026, 7, 17)),
+                transport=transport,
+                commit_feed=CommitFeed(transport, watermark_file=watermark_file, now=lambda: NOW),
+                summarizer=FailingSummarizer(),
+                report_dir=tmp_path / "reports",
+                published_at=NOW,
+            )
+        next_day = NOW + timedelta(days=1)
+        artifacts = await run_daily(
+            daily_config(date(2026, 7, 18)),
+            transport=transport,
+            commit_feed=CommitFeed(transport, watermark_file=watermark_file, now=lambda: next_day),
+            summarizer=DisabledSummarizer(),
+            report_dir=tmp_path / "reports",
+            published_at=next_day,
+        )
+
+    assert [(repo["name"], repo["commit_count"]) for repo in artifacts.load_report()["repos"]] == [
+        ("org/first", 1),
+        ("org/second", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resumed_run_skips_rows_already_in_the_days_segments(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    repos = [starred_repo("org/a", "A"), starred_repo("org/b", "B")]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/user/starred":
+            return httpx.Response(200, json=repos)
+        return httpx.Response(200, json=[commit(request.url.path, "Change", "2026-07-17T07:00:00Z")])
+
+    write_markdown = ReportSegments.write_markdown
+    failures = [OSError("Disk full")]
+
+    def failing_write_markdown(self: ReportSegments, path: Path) -> None:
+        if failures:
+            raise failures.pop()
+        write_markdown(self, path)
+
+    monkeypatch.setattr(ReportSegments, "write_markdown", failing_write_markdown)
+    config = Config(
+        github_token="token",
+        report_date=date(2026, 7, 17),
+        repo_limit=2,
+        empty_streak_limit=10,
+        summarizer_model=None,
+        is_ci=False,
+        github_output=None,
+    )
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        for _ in range(2):
+            try:
+                artifacts = await run_daily(
+                    config,
+                    transport=transport,
+                    commit_feed=CommitFeed(transport, watermark_file=tmp_path / "watermarks.json", now=lambda: NOW),
+                    summarizer=DisabledSummarizer(),
+                    report_dir=tmp_path / "reports",
+                    published_at=NOW,
+                )
+            except OSError:
+                assert (tmp_path / "reports" / "checkpoint_2026-07-17.jsonl").exists()
+
+    report = artifacts.load_report()
+    assert [repo["name"] for repo in report["repos"]] == ["org/a", "org/b"]
+    assert report["total_commits_count"] == 2
+    assert list(json.loads((tmp_path / "watermarks.json").read_text())["watermarks"]) == ["org/a", "org/b"]
+
+
+@pytest.mark.asyncio
+async def test_state_store_backs_same_day_merge_and_still_exports_json(tmp_path: Path) -> None:
+    repos = [starred_repo("org/alpha", "Alpha"), starred_repo("org/beta", "Beta")]
+    request_counts: Counter[str] = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        request_counts[request.url.path] += 1
+        if request.url.path == "/user/starred":
+            return httpx.Response(200, json=repos)
+        return httpx.Response(
+            200,
+            headers={"Last-Modified": "Fri, 17 Jul 2026 07:30:00 GMT"},
+            json=[commit(request.url.path, "Change", "2026-07-17T07:00:00Z")],
+        )
+
+    config = Config(
+        github_token="token",
+        report_date=date(2026, 7, 17),
+        repo_limit=1,
+        empty_streak_limit=10,
+        summarizer_model=None,
+        is_ci=False,
+        github_output=None,
+    )
+    store = StateStore(tmp_path / "state.db")
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        for _ in range(2):
+            artifacts = await run_daily(
+                config,
+                transport=transport,
+                commit_feed=CommitFeed(
+                    transport, watermark_file=tmp_path / "watermarks.json", now=lambda: NOW, state_store=store
+                ),
+                summarizer=DisabledSummarizer(),
+                report_dir=tmp_path / "reports",
+                published_at=NOW,
+                state_store=store,
+            )
+
+    assert [repo["name"] for repo in artifacts.load_report()["repos"]] == ["org/alpha", "org/beta"]
+    assert artifacts.load_report()["total_commits_count"] == 2
+    assert json.loads(artifacts.report_path.read_text()) == artifacts.load_report()
+    assert store.watermarks() == {
+        "org/alpha": "2026-07-17T07:30:00+00:00",
+        "org/beta": "2026-07-17T07:30:00+00:00",
+    }
+    assert request_counts["/repos/org/alpha/commits"] == 1
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_empty_state_store_imports_the_days_existing_rows(tmp_path: Path) -> None:
+    repos = [starred_repo("org/alpha", "Alpha"), starred_repo("org/beta", "Beta")]
+    request_counts: Counter[str] = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        request_counts[request.url.path] += 1
+        if request.url.path == "/user/starred":
+            return httpx.Response(200, json=repos)
+        return httpx.Response(200, json=[commit(request.url.path, "Change", "2026-07-17T07:00:00Z")])
+
+    config = Config(
+        github_token="token",
+        report_date=date(2026, 7, 17),
+        repo_limit=1,
+        empty_streak_limit=10,
+        summarizer_model=None,
+        is_ci=False,
+        github_output=None,
+    )
+    store = StateStore(tmp_path / "state.db")
+    async with GitHubClient("token", transport=httpx.MockTransport(handler)) as transport:
+        for state_store in (None, store):
+            artifacts = await run_daily(
+                config,
+                transport=transport,
+                commit_feed=CommitFeed(transport, watermark_file=tmp_path / "watermarks.json", now=lambda: NOW),
+                summarizer=DisabledSummarizer(),
+                report_dir=tmp_path / "reports",
+                published_at=NOW,
+                state_store=state_store,
+            )
+
+    assert [repo["name"] for repo in artifacts.load_report()["repos"]] == ["org/alpha", "org/beta"]
+    assert store.report_names(date(2026, 7, 17)) == {"org/alpha", "org/beta"}
+    assert request_counts["/repos/org/alpha/commits"] == 1
+    store.close()
+
+
 @pytest.mark.asyncio
 async def test_ci_outputs_preserve_workflow_contract(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.chdir(tmp_path)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import datetime, timezone
+
+import pytest
+from records import Commit, Repo
+
+
+def test_repo_keeps_only_report_fields_and_parses_pushed_at_once() -> None:
+    repo = Repo.from_github(
+        {
+            "full_name": "org/project",
+            "html_url": "https://github.com/org/project",
+            "description": "Useful project",
+            "topics": ["python"],
+            "pushed_at": "2026-07-17T07:45:00Z",
+            "owner": {"login": "org"},
+            "size": 42,
+        }
+    )
+
+    assert repo == Repo(
+        full_name="org/project",
+        html_url="https://github.com/org/project",
+        description="Useful project",
+        topics=("python",),
+        pushed_at=datetime(2026, 7, 17, 7, 45, tzinfo=timezone.utc),
+    )
+    assert Repo.from_github(repo.to_json()) == repo
+
+
+def test_commit_round_trips_through_json_and_detects_bots() -> None:
+    commit = Commit.from_github(
+        {
+            "sha": "abc",
+            "url": "https://api.github.com/commits/abc",
+            "author": {"login": "alice", "type": "User", "avatar_url": "https://example.com/alice.png"},
+            "parents": [{"sha": "def"}],
+            "commit": {
+                "message": "Add feature",
+                "author": {"date": "2026-07-17T06:00:00Z"},
+                "committer": {"date": "2026-07-17T07:00:00+02:00"},
+                "verification": {"verified": False},
+            },
+        }
+    )
+
+    assert commit.authored_date == "2026-07-17T06:00:00Z"
+    assert commit.committed_at == datetime(2026, 7, 17, 5, 0, tzinfo=timezone.utc)
+    assert Commit.from_github(commit.to_json()) == commit
+    assert not commit.is_bot
+    assert replace(commit, author_login=None).is_bot
+    assert replace(commit, author_login="renovate[bot]").is_bot
+    assert replace(commit, author_type="Bot").is_bot
+
+
+def test_naive_timestamps_are_rejected_at_ingestion() -> None:
+    with pytest.raises(ValueError, match="timezone"):
+        Repo.from_github({"full_name": "org/naive", "pushed_at": "2026-07-17T07:00:00"})
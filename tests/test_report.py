@@ -1,51 +1,61 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-
-from report import assemble_report, merge_reports, render_json_feed, render_markdown
-
-
-def repo(name: str, *, topics: list[str] | None = None) -> dict:
-    return {
-        "full_name": name,
-        "html_url": f"https://github.com/{name}",
-        "description": f"Description for {name}",
-        "topics": topics or [],
-    }
+from typing import Any
+
+from records import Commit, Repo, parse_datetime
+from report import (
+    ReportRow,
+    assemble_report,
+    iter_json_feed_items,
+    iter_markdown,
+    json_feed,
+    render_json_feed,
+    render_markdown,
+)
+
+
+def repo(name: str, *, topics: list[str] | None = None) -> Repo:
+    return Repo(
+        full_name=name,
+        html_url=f"https://github.com/{name}",
+        description=f"Description for {name}",
+        topics=tuple(topics or ()),
+    )
 
 
-def commit(sha: str, message: str, committed_at: str) -> dict:
-    return {
-        "sha": sha,
-        "commit": {
-            "message": message,
-            "author": {"date": committed_at},
-            "committer": {"date": committed_at},
-        },
-    }
+def commit(sha: str, message: str, committed_at: str) -> Commit:
+    return Commit(
+        sha=sha,
+        message=message,
+        authored_date=committed_at,
+        committed_at=parse_datetime(committed_at),
+        author_login="alice",
+    )
 
 
-def test_assemble_report_counts_only_repos_with_commits_as_active() -> None:
+def test_assemble_report_uses_true_counts_and_counts_only_repos_with_commits_as_active() -> None:
     report = assemble_report(
         [
-            (
-                repo("org/active", topics=["python"]),
-                [commit("abc1234", "Add feature", "2026-07-17T07:00:00Z")],
-                "✨ Feature",
+            ReportRow(
+                repo=repo("org/active", topics=["python"]),
+                commits=[commit("abc1234", "Add feature", "2026-07-17T07:00:00Z")],
+                summary="✨ Feature",
+                commit_count=250,
             ),
-            (repo("org/quiet"), [], None),
+            ReportRow(repo=repo("org/quiet"), commits=[], summary=None, commit_count=0),
         ]
     )
 
     assert report == {
         "total_repos_count": 2,
         "active_repos_count": 1,
-        "total_commits_count": 1,
+        "total_commits_count": 250,
         "repos": [
             {
                 "name": "org/active",
                 "url": "https://github.com/org/active",
-                "commit_count": 1,
+                "commit_count": 250,
                 "summary": "✨ Feature",
                 "description": "Description for org/active",
                 "commits": [
@@ -69,34 +79,8 @@ def test_assemble_report_counts_only_repos_with_commits_as_active() -> None:
     }
 
 
-def test_merge_reports_combines_same_day_counts_and_order() -> None:
-    left = {
-        "total_repos_count": 1,
-        "active_repos_count": 1,
-        "total_commits_count": 2,
-        "repos": [{"name": "org/first"}],
-    }
-    right = {
-        "total_repos_count": 2,
-        "active_repos_count": 1,
-        "total_commits_count": 1,
-        "repos": [{"name": "org/second"}, {"name": "org/quiet"}],
-    }
-
-    assert merge_reports(left, right) == {
-        "total_repos_count": 3,
-        "active_repos_count": 2,
-        "total_commits_count": 3,
-        "repos": [
-            {"name": "org/first"},
-            {"name": "org/second"},
-            {"name": "org/quiet"},
-        ],
-    }
-
-
 def test_markdown_groups_shared_topics_then_other_in_stable_order() -> None:
-    report = {
+    report: dict[str, Any] = {
         "total_repos_count": 7,
         "active_repos_count": 6,
         "total_commits_count": 10,
@@ -132,10 +116,42 @@ _6 active repos with 10 new commits_
     )
     assert "topics/hacktoberfest" not in markdown
     assert "org/plain" not in markdown
+    assert "".join(iter_markdown({**report, "repos": iter(report["repos"])})) == markdown
 
 
-def test_json_feed_rendering_is_deterministic() -> None:
+def test_markdown_groups_later_repos_by_the_narrowing_shared_topics() -> None:
     report = {
+        "total_repos_count": 6,
+        "active_repos_count": 5,
+        "total_commits_count": 7,
+        "repos": [
+            _render_repo("org/a", 1, ["x", "y"]),
+            _render_repo("org/b", 2, ["y", "z"]),
+            _render_repo("org/c", 1, ["x"]),
+            _render_repo("org/d", 1, ["z"]),
+            _render_repo("org/e", 2, ["y", "x"]),
+            _render_repo("org/f", 0, ["y"]),
+        ],
+    }
+
+    assert (
+        render_markdown(report)
+        == """# Recent Activity in Starred Repositories
+_5 active repos with 7 new commits_
+
+## [y](https://github.com/topics/y)
+- [org/b](https://github.com/org/b) [2](https://github.com/org/b/commits): Summary org/b
+- [org/e](https://github.com/org/e) [2](https://github.com/org/e/commits): Summary org/e
+- [org/a](https://github.com/org/a) [1](https://github.com/org/a/commits): Summary org/a
+
+## Other
+- [org/c](https://github.com/org/c) [1](https://github.com/org/c/commits): Summary org/c
+- [org/d](https://github.com/org/d) [1](https://github.com/org/d/commits): Summary org/d"""
+    )
+
+
+def test_json_feed_rendering_is_deterministic() -> None:
+    report: dict[str, Any] = {
         "total_repos_count": 1,
         "active_repos_count": 1,
         "total_commits_count": 1,
@@ -158,7 +174,8 @@ def test_json_feed_rendering_is_deterministic() -> None:
         ],
     }
 
-    feed = render_json_feed(report, published_at=datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc))
+    published_at = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+    feed = render_json_feed(report, published_at=published_at)
 
     assert feed == {
         "version": "https://jsonfeed.org/version/1.1",
@@ -186,6 +203,7 @@ def test_json_feed_rendering_is_deterministic() -> None:
             }
         ],
     }
+    assert json_feed(list(iter_json_feed_items(iter(report["repos"]), published_at=published_at))) == feed
 
 
 def _render_repo(name: str, commit_count: int, topics: list[str]) -> dict:
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from report import render_json_feed, render_markdown
+from report_segments import ReportSegments
+
+PUBLISHED_AT = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+
+
+def test_appended_segments_render_like_the_whole_day(tmp_path: Path) -> None:
+    repos = [
+        _repo("org/a", 1, ["x", "y"]),
+        _repo("org/b", 2, ["y", "z"]),
+        _repo("org/quiet", 0, ["y"]),
+        _repo("org/c", 1, ["x"]),
+        _repo("org/d", 1, ["z"]),
+        _repo("org/e", 2, ["y", "x"]),
+        _repo("org/plain", 3, []),
+    ]
+    report = {
+        "total_repos_count": 7,
+        "active_repos_count": 6,
+        "total_commits_count": 10,
+        "repos": repos,
+    }
+    report_path = tmp_path / "recent_commits_2026-07-17.json"
+
+    ReportSegments(report_path).append(repos[:3], published_at=PUBLISHED_AT)
+    segments = ReportSegments(report_path)
+    segments.append(repos[3:], published_at=PUBLISHED_AT)
+    segments.write_report(report_path)
+    segments.write_markdown(tmp_path / "report.md")
+    segments.write_feed(tmp_path / "feed.json")
+
+    assert segments.names == {repo["name"] for repo in repos}
+    assert report_path.read_text(encoding="utf-8") == json.dumps(report, ensure_ascii=False, indent=2)
+    assert (tmp_path / "report.md").read_text(encoding="utf-8") == render_markdown(report)
+    assert (tmp_path / "feed.json").read_text(encoding="utf-8") == json.dumps(
+        render_json_feed(report, published_at=PUBLISHED_AT), ensure_ascii=False, indent=2
+    )
+
+
+def test_segments_written_after_the_last_saved_state_are_discarded(tmp_path: Path) -> None:
+    report_path = tmp_path / "recent_commits_2026-07-17.json"
+    ReportSegments(report_path).append([_repo("org/a", 1, [])], published_at=PUBLISHED_AT)
+    with report_path.with_suffix(".segments.jsonl").open("a", encoding="utf-8") as segments_file:
+        segments_file.write('{"name": "org/interrupted", "rep')
+
+    segments = ReportSegments(report_path)
+    segments.append([_repo("org/b", 2, [])], published_at=PUBLISHED_AT)
+    segments.write_report(report_path)
+
+    assert segments.totals == (2, 2, 3)
+    assert [repo["name"] for repo in json.loads(report_path.read_text(encoding="utf-8"))["repos"]] == [
+        "org/a",
+        "org/b",
+    ]
+
+
+def _repo(name: str, commit_count: int, topics: list[str]) -> dict:
+    return {
+        "name": name,
+        "url": f"https://github.com/{name}",
+        "commit_count": commit_count,
+        "summary": f"Summary {name}",
+        "description": "✨ Project",
+        "commits": [
+            {
+                "sha": f"{name}-sha-{index}",
+                "message": f"Commit {index} in {name}",
+                "date": "2026-07-17T07:00:00Z",
+            }
+            for index in range(commit_count)
+        ],
+        "topics": topics,
+    }
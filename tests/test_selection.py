@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from records import Repo
 from selection import advance_empty_streak, select_repos
 
 
-def repo(name: str, *, active: bool = True) -> dict:
-    return {"full_name": name, "active": active}
+def repo(name: str, *, active: bool = True) -> Repo:
+    return Repo(full_name=name, html_url=f"https://github.com/{name}", description="active" if active else None)
 
 
 def test_selection_excludes_then_checks_activity_then_applies_limit() -> None:
@@ -20,10 +21,10 @@ def test_selection_excludes_then_checks_activity_then_applies_limit() -> None:
         repos,
         excluded_names={"org/already"},
         limit=2,
-        is_active=lambda candidate: candidate["active"],
+        is_active=lambda candidate: candidate.description == "active",
     )
 
-    assert [item["full_name"] for item in selected] == ["org/first", "org/second"]
+    assert [item.full_name for item in selected] == ["org/first", "org/second"]
 
 
 def test_selection_with_nonpositive_limit_selects_nothing() -> None:
@@ -32,7 +33,7 @@ def test_selection_with_nonpositive_limit_selects_nothing() -> None:
             [repo("org/project")],
             excluded_names=set(),
             limit=0,
-            is_active=lambda candidate: candidate["active"],
+            is_active=lambda candidate: candidate.description == "active",
         )
         == []
     )
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+from state_store import StateStore
+
+DAY = date(2026, 7, 17)
+
+
+def entry(name: str, commits: list[dict]) -> dict:
+    item = {
+        "name": name,
+        "url": f"https://github.com/{name}",
+        "commit_count": len(commits),
+        "summary": None,
+        "description": None,
+        "commits": commits,
+    }
+    return item
+
+
+def test_watermarks_upsert_and_survive_reopen(tmp_path: Path) -> None:
+    store = StateStore(tmp_path / "state.db")
+    store.save_watermark("org/project", "2026-07-17T07:00:00+00:00")
+    store.save_watermark("org/project", "2026-07-17T08:00:00+00:00", head="abc", checked_at="2026-07-17T08:05:00+00:00")
+    store.close()
+
+    reopened = StateStore(tmp_path / "state.db")
+
+    assert reopened.watermarks() == {"org/project": "2026-07-17T08:00:00+00:00"}
+    assert reopened.heads() == {"org/project": "abc"}
+    assert reopened.checked() == {"org/project": "2026-07-17T08:05:00+00:00"}
+
+
+def test_report_rows_append_per_day_and_rebuild_in_order(tmp_path: Path) -> None:
+    store = StateStore(tmp_path / "state.db")
+    first = entry("org/first", [{"sha": "a", "message": "Add", "date": "2026-07-17T07:00:00Z"}])
+    second = entry(
+        "org/second",
+        [
+            {"sha": "b", "message": "Fix", "date": "2026-07-17T07:00:00Z"},
+            {"sha": "c", "message": "Tune", "date": "2026-07-17T06:00:00Z"},
+        ],
+    )
+    quiet = entry("org/quiet", [])
+    store.append_report(DAY, {"repos": [first]})
+    store.append_report(DAY, {"repos": [second, quiet]})
+    store.append_report(date(2026, 7, 16), {"repos": [entry("org/yesterday", [])]})
+
+    assert store.report_names(DAY) == {"org/first", "org/second", "org/quiet"}
+    assert list(store.iter_report_repos(DAY)) == [first, second, quiet]
+    assert list(store.iter_report_repos(date(2026, 7, 15))) == []
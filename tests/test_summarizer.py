@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
 import pytest
-from summarizer import CannedSummarizer, DisabledSummarizer
+from records import Commit, Repo
+from summarizer import BatchingSummarizer, CachedSummarizer, CannedSummarizer, DisabledSummarizer
+
+NOW = datetime(2026, 7, 17, 8, 0, tzinfo=timezone.utc)
+REPO = Repo(full_name="owner/project", html_url="https://github.com/owner/project", description="A useful project")
 
-REPO = {"full_name": "owner/project", "description": "A useful project"}
 
+def repo(name: str) -> Repo:
+    return Repo(full_name=name, html_url=f"https://github.com/{name}")
 
-def commit(message: str) -> dict:
-    return {"commit": {"message": message}}
+
+def commit(message: str) -> Commit:
+    return Commit(
+        sha=message.lower().replace(" ", "-"),
+        message=message,
+        authored_date="2026-07-17T07:00:00Z",
+        committed_at=NOW,
+        author_login="alice",
+    )
 
 
 @pytest.mark.asyncio
@@ -70,3 +86,161 @@ async def test_disabled_summarizer_returns_no_summary() -> None:
     summary = await DisabledSummarizer().summarize(REPO, [commit("First change"), commit("Second change")])
 
     assert summary is None
+
+
+@pytest.mark.asyncio
+async def test_batching_summarizer_packs_repos_into_one_json_request() -> None:
+    canned = CannedSummarizer('```json\n{"org/first": "✨ First", "org/second": "NONE"}\n```')
+    summarizer = BatchingSummarizer(canned)
+
+    summaries = await summarizer.summarize_many(
+        [
+            (repo("org/first"), [commit("First change"), commit("Second change")]),
+            (repo("org/single"), [commit("Only change")]),
+            (repo("org/second"), [commit("Third change"), commit("Fourth change")]),
+        ]
+    )
+
+    assert summaries == ["✨ First", None, None]
+    assert len(canned.prompts) == 1
+    assert "Repository: org/first" in canned.prompts[0]
+    assert "Repository: org/second" in canned.prompts[0]
+    assert "org/single" not in canned.prompts[0]
+
+
+@pytest.mark.asyncio
+async def test_batching_summarizer_falls_back_to_per_repo_prompts_on_bad_answer() -> None:
+    canned = CannedSummarizer("✨ Not JSON")
+    summarizer = BatchingSummarizer(canned)
+
+    summaries = await summarizer.summarize_many(
+        [
+            (repo("org/first"), [commit("First change"), commit("Second change")]),
+            (repo("org/second"), [commit("Third change"), commit("Fourth change")]),
+        ]
+    )
+
+    assert summaries == ["✨ Not JSON", "✨ Not JSON"]
+    assert len(canned.prompts) == 3
+    assert [prompt.startswith("Repository: ") and "JSON" not in prompt for prompt in canned.prompts[1:]] == [
+        True,
+        True,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batching_summarizer_splits_batches_by_token_budget() -> None:
+    canned = CannedSummarizer("✨ Single")
+    summarizer = BatchingSummarizer(canned, token_budget=1)
+
+    summaries = await summarizer.summarize_many(
+        [
+            (repo("org/first"), [commit("First change"), commit("Second change")]),
+            (repo("org/second"), [commit("Third change"), commit("Fourth change")]),
+        ]
+    )
+
+    assert summaries == ["✨ Single", "✨ Single"]
+    assert len(canned.prompts) == 2
+    assert not any("JSON" in prompt for prompt in canned.prompts)
+
+
+@pytest.mark.asyncio
+async def test_cached_summarizer_reuses_persisted_summaries_for_the_same_commits(tmp_path: Path) -> None:
+    cache_file = tmp_path / "summaries.json"
+    commits = [commit("First change"), commit("Second change")]
+    first_canned = CannedSummarizer("✨ Cached")
+    first = CachedSummarizer(first_canned, cache_file=cache_file, model="model", now=lambda: NOW)
+    assert await first.summarize(REPO, commits) == "✨ Cached"
+    first.save()
+
+    second_canned = CannedSummarizer("must not be used")
+    second = CachedSummarizer(second_canned, cache_file=cache_file, model="model", now=lambda: NOW)
+    assert await second.summarize(REPO, commits) == "✨ Cached"
+    assert await second.summarize(REPO, [*commits, commit("Third change")]) == "must not be used"
+
+    assert len(first_canned.prompts) == 1
+    assert len(second_canned.prompts) == 1
+    assert (second.hits, second.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_cached_summarizer_key_includes_model(tmp_path: Path) -> None:
+    cache_file = tmp_path / "summaries.json"
+    commits = [commit("First change"), commit("Second change")]
+    previous = CachedSummarizer(CannedSummarizer("✨ Old"), cache_file=cache_file, model="old", now=lambda: NOW)
+    await previous.summarize(REPO, commits)
+    previous.save()
+
+    summarizer = CachedSummarizer(CannedSummarizer("✨ New"), cache_file=cache_file, model="new", now=lambda: NOW)
+
+    assert await summarizer.summarize(REPO, commits) == "✨ New"
+
+
+@pytest.mark.asyncio
+async def test_cached_summarizer_evicts_expired_then_least_recently_used(tmp_path: Path) -> None:
+    cache_file = tmp_path / "summaries.json"
+    clock = [NOW - timedelta(days=10)]
+    summarizer = CachedSummarizer(
+        CannedSummarizer("✨ Summary"),
+        cache_file=cache_file,
+        model="model",
+        now=lambda: clock[0],
+        ttl=timedelta(days=7),
+        max_entries=2,
+    )
+    await summarizer.summarize(repo("org/expired"), [commit("A one"), commit("A two")])
+    clock[0] = NOW
+    await summarizer.summarize(repo("org/old"), [commit("B one"), commit("B two")])
+    clock[0] = NOW + timedelta(minutes=1)
+    await summarizer.summarize(repo("org/recent"), [commit("C one"), commit("C two")])
+    clock[0] = NOW + timedelta(minutes=2)
+    await summarizer.summarize(repo("org/old"), [commit("B one"), commit("B two")])
+    clock[0] = NOW + timedelta(minutes=3)
+    await summarizer.summarize(repo("org/newest"), [commit("D one"), commit("D two")])
+    summarizer.save()
+
+    entries = json.loads(cache_file.read_text())["entries"]
+    assert sorted(entry["used_at"] for entry in entries.values()) == [
+        (NOW + timedelta(minutes=2)).isoformat(),
+        (NOW + timedelta(minutes=3)).isoformat(),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cached_summarizer_treats_expired_entries_as_misses_and_prunes_them_on_load(tmp_path: Path) -> None:
+    cache_file = tmp_path / "summaries.json"
+    commits = [commit("First change"), commit("Second change")]
+    clock = [NOW]
+    previous = CachedSummarizer(
+        CannedSummarizer("✨ Stale"), cache_file=cache_file, model="model", now=lambda: clock[0]
+    )
+    await previous.summarize(REPO, commits)
+    previous.save()
+
+    canned = CannedSummarizer("✨ Fresh")
+    summarizer = CachedSummarizer(canned, cache_file=cache_file, model="model", now=lambda: clock[0])
+    clock[0] = NOW + timedelta(days=8)
+    assert await summarizer.summarize(REPO, commits) == "✨ Fresh"
+    assert (summarizer.hits, summarizer.misses) == (0, 1)
+
+    idle = CachedSummarizer(CannedSummarizer("unused"), cache_file=cache_file, model="model", now=lambda: clock[0])
+    idle.save()
+    assert json.loads(cache_file.read_text())["entries"] == {}
+
+
+@pytest.mark.asyncio
+async def test_cached_summarizer_saves_once_and_skips_requests_without_a_model_call(tmp_path: Path) -> None:
+    cache_file = tmp_path / "summaries.json"
+    canned = CannedSummarizer("✨ Summary")
+    summarizer = CachedSummarizer(canned, cache_file=cache_file, model="model", now=lambda: NOW)
+
+    summaries = await summarizer.summarize_many(
+        [(repo("org/busy"), [commit("First change"), commit("Second change")]), (repo("org/quiet"), [commit("Fix")])]
+    )
+
+    assert summaries == ["✨ Summary", None]
+    assert not cache_file.exists()
+    summarizer.save()
+    assert len(json.loads(cache_file.read_text())["entries"]) == 1
+    assert (summarizer.hits, summarizer.misses) == (0, 1)